@@ -9,7 +9,7 @@ import logging
 import time
 from meter2mqtt.devices import create_device
 from meter2mqtt.devices.ha_metadata import get_parameter_metadata
-from meter2mqtt.mqtt import mqtt_handler
+from meter2mqtt.handlers.mqtt import mqtt_handler
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
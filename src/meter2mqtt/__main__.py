@@ -3,17 +3,33 @@
 # Multi-device daemon for meter2mqtt
 
 import sys
+import heapq
 import signal
 import logging
+import itertools
+import queue
+import threading
 import time
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from meter2mqtt.handlers.config import load_base_config, load_device_configs, get_mqtt_config, get_logging_config
+from meter2mqtt.devices.base import BaseDevice
 from meter2mqtt.devices.lifecycle import DeviceLifecycleManager
+from meter2mqtt.devices.ha_metadata import get_parameter_formats
 from meter2mqtt.handlers.mqtt import mqtt_handler
 
 log = logging.getLogger(__name__)
 
+_NS_PER_SECOND = 1_000_000_000
+
+# Upper bound on devices read concurrently; reads are blocking serial/socket I/O
+_MAX_READ_WORKERS = 16
+
+# Seconds to wait at shutdown for the broker to acknowledge queued publishes
+_SHUTDOWN_FLUSH_TIMEOUT = 5.0
+
 
 class Meter2MQTTDaemon:
     """Main daemon for multi-device meter reading and MQTT publishing."""
@@ -27,8 +43,41 @@ class Meter2MQTTDaemon:
             config_dir: Path to device configs directory
         """
         self.running = True
+        self._cleaned_up = False
         self.mqtt_handler_instance: Optional[mqtt_handler] = None
         self.lifecycle_manager: Optional[DeviceLifecycleManager] = None
+        self._topic_prefix = "meters"
+        self._force_republish_interval_ns = 300 * _NS_PER_SECOND
+        
+        # Poll schedule: min-heap of (deadline, device_id, token) ordered by
+        # next-due time in time.monotonic_ns() units. A device's entry is only
+        # live while its token matches _schedule_tokens; removal just drops the token.
+        self._schedule: List[Tuple[int, str, int]] = []
+        self._schedule_tokens: Dict[str, int] = {}
+        self._schedule_lock = threading.Lock()
+        self._token_counter = itertools.count()
+        self._wake = threading.Event()
+        self._read_pool = ThreadPoolExecutor(max_workers=_MAX_READ_WORKERS, thread_name_prefix="meter-read")
+        # Reads run on the pool and report back through this queue, so the
+        # daemon loop never blocks on a slow device. _reading holds the devices
+        # with a read in flight (daemon thread only).
+        self._completed_reads: queue.SimpleQueue = queue.SimpleQueue()
+        self._reading: Set[str] = set()
+        
+        # Per-device scheduler state, one table per field keyed by device_id and
+        # filled in once at registration so the read path makes no per-device
+        # method calls or lifecycle manager lookups
+        self._devices: Dict[str, BaseDevice] = {}
+        self._poll_interval_ns: Dict[str, int] = {}
+        # Topic base "<prefix>/<device_type>/<device_id>/"
+        self._topic_bases: Dict[str, str] = {}
+        # Float format spec by parameter, from the HA metadata
+        self._param_formats: Dict[str, Dict[str, str]] = {}
+        
+        # Publish-on-change state: last published message per parameter and the
+        # time of the last full (unfiltered) publish per device
+        self._last_values: Dict[str, Dict[str, str]] = {}
+        self._last_full_publish: Dict[str, int] = {}
         
         try:
             # Load base configuration
@@ -39,7 +88,11 @@ class Meter2MQTTDaemon:
             self._initialize_mqtt()
             
             # Initialize device lifecycle manager
-            self.lifecycle_manager = DeviceLifecycleManager(config_dir=config_dir)
+            self.lifecycle_manager = DeviceLifecycleManager(
+                config_dir=config_dir,
+                on_device_added=self._schedule_device,
+                on_device_removed=self._unschedule_device,
+            )
             self.lifecycle_manager.start_watching()
             
             # Load initial device configurations
@@ -58,6 +111,8 @@ class Meter2MQTTDaemon:
         """Initialize MQTT handler."""
         try:
             mqtt_cfg = get_mqtt_config(self.base_config)
+            self._topic_prefix = mqtt_cfg.get("topic_prefix", "meters")
+            self._force_republish_interval_ns = int(float(mqtt_cfg.get("force_republish_interval", 300)) * _NS_PER_SECOND)
             self.mqtt_handler_instance = mqtt_handler(mqtt_cfg)
             self.mqtt_handler_instance.connect()
             log.info("MQTT handler initialized")
@@ -66,14 +121,28 @@ class Meter2MQTTDaemon:
             raise
 
     def signal_handler(self, signum, frame):
-        """Handle shutdown signals gracefully."""
+        """
+        Handle shutdown signals gracefully.
+        
+        Only stops the daemon loop: the handler runs on the main thread, which
+        may be holding the schedule lock, so teardown is left to run().
+        """
         log.info(f"Received signal {signum}, shutting down daemon")
         self.running = False
-        self.cleanup()
-        sys.exit(0)
+        self._wake.set()
 
     def cleanup(self):
-        """Clean up resources."""
+        """
+        Clean up resources.
+        
+        Runs once: a second flush after loop_stop() could only time out.
+        """
+        if self._cleaned_up:
+            return
+        self._cleaned_up = True
+        
+        self._read_pool.shutdown(wait=False, cancel_futures=True)
+        
         try:
             if self.lifecycle_manager:
                 self.lifecycle_manager.shutdown()
@@ -82,6 +151,7 @@ class Meter2MQTTDaemon:
         
         try:
             if self.mqtt_handler_instance:
+                self.mqtt_handler_instance.flush(_SHUTDOWN_FLUSH_TIMEOUT)
                 self.mqtt_handler_instance.loop_stop()
                 self.mqtt_handler_instance.disconnect()
         except Exception as e:
@@ -94,11 +164,7 @@ class Meter2MQTTDaemon:
         try:
             while self.running:
                 try:
-                    # Read from all active devices
-                    self._read_all_devices()
-                    
-                    # Small delay to prevent busy-waiting
-                    time.sleep(1)
+                    self._tick()
                 
                 except Exception as e:
                     log.error(f"Error in daemon loop: {e}")
@@ -108,51 +174,260 @@ class Meter2MQTTDaemon:
         finally:
             self.cleanup()
 
-    def _read_all_devices(self):
-        """Read from all active devices and publish to MQTT."""
-        devices = self.lifecycle_manager.get_all_devices()
+    def _schedule_device(self, device_id: str, device):
+        """
+        Add a device to the poll schedule (lifecycle manager hook).
+        
+        New devices are due immediately and wake the daemon loop.
+        
+        Args:
+            device_id: Device identifier
+            device: Device instance
+        """
+        device_type = device.get_device_type()
+        self._devices[device_id] = device
+        self._topic_bases[device_id] = f"{self._topic_prefix}/{device_type}/{device_id}/"
+        self._param_formats[device_id] = get_parameter_formats(device_type)
+        self._poll_interval_ns[device_id] = int(float(device.get_poll_interval()) * _NS_PER_SECOND)
+        
+        with self._schedule_lock:
+            token = next(self._token_counter)
+            self._schedule_tokens[device_id] = token
+            heapq.heappush(self._schedule, (time.monotonic_ns(), device_id, token))
+        self._wake.set()
+
+    def _unschedule_device(self, device_id: str):
+        """
+        Remove a device from the poll schedule (lifecycle manager hook).
+        
+        The heap entry is left in place and discarded when it comes due.
+        
+        Args:
+            device_id: Device identifier
+        """
+        with self._schedule_lock:
+            self._schedule_tokens.pop(device_id, None)
+        self._devices.pop(device_id, None)
+        self._topic_bases.pop(device_id, None)
+        self._param_formats.pop(device_id, None)
+        self._poll_interval_ns.pop(device_id, None)
+        self._last_values.pop(device_id, None)
+        self._last_full_publish.pop(device_id, None)
+
+    def _tick(self):
+        """Handle finished reads, start the due ones, then wait for the next event."""
+        self._wake.clear()
+        self._handle_completed_reads()
+        
+        due = []
+        with self._schedule_lock:
+            now = time.monotonic_ns()
+            while self._schedule and self._schedule[0][0] <= now:
+                deadline, device_id, token = heapq.heappop(self._schedule)
+                # Skip entries of devices removed or reloaded since they were scheduled
+                if self._schedule_tokens.get(device_id) == token:
+                    due.append((device_id, token))
+        
+        if due:
+            self._read_devices(due)
+        
+        with self._schedule_lock:
+            timeout_ns = self._schedule[0][0] - time.monotonic_ns() if self._schedule else None
+        
+        # Sleep until the next deadline, or until a read finishes, a device is
+        # added or a signal arrives
+        if timeout_ns is None or timeout_ns > 0:
+            self._wake.wait(None if timeout_ns is None else timeout_ns / _NS_PER_SECOND)
+
+    def _read_devices(self, due: List[Tuple[str, int]]):
+        """
+        Start reads of the due devices on the read pool without waiting for them.
+        
+        A device is rescheduled when its read finishes (see
+        _handle_completed_reads()), so a slow or hanging read only delays
+        that device. A device reloaded while the read of its previous
+        instance is still in flight is pushed back one poll interval.
+        
+        Args:
+            due: List of (device_id, schedule token) whose deadline has passed
+        """
+        devices = self._devices
+        for device_id, token in due:
+            device = devices.get(device_id)
+            if device is None:
+                continue
+            started = time.monotonic_ns()
+            
+            if device_id in self._reading:
+                with self._schedule_lock:
+                    if self._schedule_tokens.get(device_id) == token:
+                        heapq.heappush(self._schedule, (started + self._poll_interval_ns[device_id], device_id, token))
+                continue
+            
+            self._reading.add(device_id)
+            future = self._read_pool.submit(device.read)
+            future.add_done_callback(partial(self._on_read_done, (device_id, device, token, started)))
+
+    def _on_read_done(self, read: Tuple[str, BaseDevice, int, int], future: Future):
+        """
+        Hand a finished read to the daemon thread (runs on the read pool).
         
-        for device_id, device in devices.items():
+        Args:
+            read: (device_id, device, schedule token, start time) of the read
+            future: The finished read
+        """
+        self._completed_reads.put((read, future))
+        self._wake.set()
+
+    def _handle_completed_reads(self):
+        """
+        Publish the values of finished reads and reschedule their devices.
+        
+        Reads of device instances that were removed or reloaded meanwhile are
+        discarded, so they neither publish nor recreate change-tracking state.
+        
+        Publishing and scheduling stay on the daemon thread. Publishes are
+        never waited on: the MQTT network thread processes the
+        acknowledgements, and queued messages are flushed at shutdown.
+        """
+        while True:
             try:
-                poll_interval = device.get_poll_interval()
-                
-                # Simple polling: read every poll_interval seconds
-                current_time = time.time()
-                device_attr = f"_last_read_{device_id}"
-                last_read = getattr(self, device_attr, 0)
-                
-                if current_time - last_read >= poll_interval:
-                    values = device.read()
-                    if values:
-                        self._publish_device_metrics(device_id, device, values)
-                    setattr(self, device_attr, current_time)
+                (device_id, device, token, started), future = self._completed_reads.get_nowait()
+            except queue.Empty:
+                return
+            self._reading.discard(device_id)
             
+            # Drop reads of devices removed or reloaded while the read was in flight
+            with self._schedule_lock:
+                if self._schedule_tokens.get(device_id) != token:
+                    continue
+            
+            try:
+                values = future.result()
+                if values:
+                    messages = self._format_values(device_id, values)
+                    changed, full = self._changed_values(device_id, messages, started)
+                    if changed:
+                        published = self._publish_device_metrics(device_id, device, changed)
+                        self._record_published(device_id, changed, published, full, started)
             except Exception as e:
                 log.error(f"Error reading device {device_id}: {e}")
+            
+            with self._schedule_lock:
+                if self._schedule_tokens.get(device_id) == token:
+                    heapq.heappush(self._schedule, (started + self._poll_interval_ns[device_id], device_id, token))
 
-    def _publish_device_metrics(self, device_id: str, device, values: dict):
+    def _format_values(self, device_id: str, values: Dict[str, Any]) -> Dict[str, str]:
         """
-        Publish device metrics to MQTT.
+        Format a reading into MQTT message strings.
+        
+        Floats use the parameter's format spec (e.g. ".3f") when known,
+        everything else is published via str().
         
         Args:
             device_id: Device identifier
-            device: Device instance
             values: Dict of parameter_name -> value
+        
+        Returns:
+            dict: Parameter name -> message
         """
-        if not self.mqtt_handler_instance:
+        formats = self._param_formats.get(device_id, {})
+        messages = {}
+        for param_name, param_value in values.items():
+            fmt = formats.get(param_name)
+            if fmt is not None and isinstance(param_value, float):
+                messages[param_name] = format(param_value, fmt)
+            else:
+                messages[param_name] = str(param_value)
+        return messages
+
+    def _changed_values(self, device_id: str, messages: Dict[str, str], now: int) -> Tuple[Dict[str, str], bool]:
+        """
+        Filter formatted messages down to the parameters that changed.
+        
+        Comparing formatted output means changes below the published
+        precision do not cause a publish. Every force_republish_interval
+        seconds the full reading is passed through so retained topics and
+        Home Assistant stay fresh. Nothing is recorded here; see
+        _record_published().
+        
+        Args:
+            device_id: Device identifier
+            messages: Dict of parameter_name -> message from the latest read
+            now: time.monotonic_ns() of the read
+        
+        Returns:
+            tuple: (parameters to publish (may be empty), whether this is a full publish)
+        """
+        last_full = self._last_full_publish.get(device_id)
+        if last_full is None or now - last_full >= self._force_republish_interval_ns:
+            return messages, True
+        
+        last_values = self._last_values.get(device_id, {})
+        changed = {
+            param_name: message
+            for param_name, message in messages.items()
+            if last_values.get(param_name) != message
+        }
+        return changed, False
+
+    def _record_published(self, device_id: str, messages: Dict[str, str], published: List[str],
+                          full: bool, now: int):
+        """
+        Remember the messages that were queued for publishing.
+        
+        Only queued messages count as published, so a value that changed
+        while the broker was unreachable is sent on the next read instead of
+        waiting for the next full publish.
+        
+        Args:
+            device_id: Device identifier
+            messages: Dict of parameter_name -> message that was published
+            published: Names of the parameters that were queued
+            full: Whether messages was a full (unfiltered) reading
+            now: time.monotonic_ns() of the read
+        """
+        if not published:
             return
         
-        mqtt_cfg = get_mqtt_config(self.base_config)
-        topic_prefix = mqtt_cfg.get("topic_prefix", "meters")
+        last_values = self._last_values.setdefault(device_id, {})
+        for param_name in published:
+            last_values[param_name] = messages[param_name]
+        if full and len(published) == len(messages):
+            self._last_full_publish[device_id] = now
+
+    def _publish_device_metrics(self, device_id: str, device, messages: Dict[str, str]) -> List[str]:
+        """
+        Publish device metrics to MQTT without waiting for delivery.
         
-        for param_name, param_value in values.items():
-            try:
-                # Topic structure: meters/<device_type>/<device_id>/<param>
-                topic = f"{topic_prefix}/{device.get_device_type()}/{device_id}/{param_name}"
-                message = str(param_value)
-                self.mqtt_handler_instance.publish(topic, message)
-            except Exception as e:
-                log.error(f"Failed to publish metric {param_name} for {device_id}: {e}")
+        Args:
+            device_id: Device identifier
+            device: Device instance
+            messages: Dict of parameter_name -> formatted message
+        
+        Returns:
+            list: Names of the parameters that were queued for publishing
+        """
+        if not self.mqtt_handler_instance:
+            return []
+        
+        # Topic structure: meters/<device_type>/<device_id>/<param>
+        topic_base = self._topic_bases.get(device_id)
+        if topic_base is None:
+            topic_base = f"{self._topic_prefix}/{device.get_device_type()}/{device_id}/"
+        
+        batch = [(topic_base + param_name, message) for param_name, message in messages.items()]
+        
+        try:
+            queued = self.mqtt_handler_instance.publish_many(batch, wait=False)
+        except Exception as e:
+            log.error(f"Failed to publish metrics for {device_id}: {e}")
+            return []
+        
+        if len(queued) == len(batch):
+            return list(messages)
+        queued_topics = {topic for topic, _ in queued}
+        return [param_name for param_name in messages if topic_base + param_name in queued_topics]
 
 
 def main():
@@ -3,7 +3,13 @@
 # Device implementations for various meter types
 
 from .base import BaseDevice
-from .factory import register_device_type, create_device, get_registered_device_types
+from .factory import (
+    register_device_type,
+    create_device,
+    resolve_device_class,
+    instantiate_device,
+    get_registered_device_types,
+)
 from .dsmr import DSMRDevice
 from .multical import MulticalDevice
 
@@ -11,4 +17,12 @@ from .multical import MulticalDevice
 register_device_type("dsmr", DSMRDevice)
 register_device_type("multical", MulticalDevice)
 
-__all__ = ["BaseDevice", "create_device", "get_registered_device_types", "DSMRDevice", "MulticalDevice"]
+__all__ = [
+    "BaseDevice",
+    "create_device",
+    "resolve_device_class",
+    "instantiate_device",
+    "get_registered_device_types",
+    "DSMRDevice",
+    "MulticalDevice",
+]
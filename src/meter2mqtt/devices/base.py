@@ -5,7 +5,7 @@
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional, Any, Sequence
 
 log = logging.getLogger(__name__)
 
@@ -19,6 +19,8 @@ class BaseDevice(ABC):
     to be managed uniformly by the framework.
     """
 
+    __slots__ = ("device_id", "device_config", "is_connected")
+
     def __init__(self, device_id: str, device_config: Dict[str, Any]):
         """
         Initialize a device.
@@ -58,16 +60,32 @@ class BaseDevice(ABC):
         pass
 
     @abstractmethod
-    def get_available_parameters(self) -> List[str]:
+    def get_available_parameters(self) -> Sequence[str]:
         """
         Get list of available parameter names for this device type.
         
+        Implementations may return a shared tuple; callers must not mutate it.
+        
         Returns:
             list: Parameter names (e.g., ["energy", "power", "temp1"])
         """
         pass
 
-    def get_enabled_parameters(self) -> List[str]:
+    def has_parameter(self, name: str) -> bool:
+        """
+        Check whether this device type can read a parameter.
+        
+        Subclasses with a fixed parameter set override this with a set lookup.
+        
+        Args:
+            name: Parameter name
+        
+        Returns:
+            bool: True if the parameter is in get_available_parameters()
+        """
+        return name in self.get_available_parameters()
+
+    def get_enabled_parameters(self) -> Sequence[str]:
         """
         Get list of parameters enabled in configuration.
         
@@ -137,7 +155,7 @@ class BaseDevice(ABC):
         return True
 
     @abstractmethod
-    def get_required_config_keys(self) -> List[str]:
+    def get_required_config_keys(self) -> Sequence[str]:
         """
         Get list of required configuration keys for this device type.
         
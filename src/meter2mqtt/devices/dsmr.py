@@ -4,15 +4,94 @@
 # Adapter for Dutch Smart Meter using dsmr-parser library
 
 import logging
-from typing import Dict, List, Optional, Any
+import re
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Optional, Any, Pattern, Tuple
 from .base import BaseDevice
+from .ha_metadata import DSMR_PARAMS
+
+try:
+    from dsmr_parser.clients import SerialReader, SocketReader
+    _HAS_DSMR = True
+except ImportError:
+    SerialReader = SocketReader = None
+    _HAS_DSMR = False
 
 log = logging.getLogger(__name__)
 
+# All DSMR parameters; the HA metadata table is the single source of truth
+_DSMR_PARAMS: Tuple[str, ...] = tuple(DSMR_PARAMS)
+_DSMR_PARAMS_SET: FrozenSet[str] = frozenset(_DSMR_PARAMS)
+
+# OBIS reference of each DSMR parameter in the raw telegram
+_OBIS_CODES: Dict[str, str] = {
+    "current_electricity_usage": "1-0:1.7.0",
+    "current_electricity_delivery": "1-0:2.7.0",
+    "electricity_used_tariff_1": "1-0:1.8.1",
+    "electricity_used_tariff_2": "1-0:1.8.2",
+    "electricity_delivered_tariff_1": "1-0:2.8.1",
+    "electricity_delivered_tariff_2": "1-0:2.8.2",
+    "electricity_active_import_total": "1-0:1.8.0",
+    "electricity_active_export_total": "1-0:2.8.0",
+    "gas_provided": "0-1:24.2.1",
+    "voltage_l1": "1-0:32.7.0",
+    "voltage_l2": "1-0:52.7.0",
+    "voltage_l3": "1-0:72.7.0",
+    "current_l1": "1-0:31.7.0",
+    "current_l2": "1-0:51.7.0",
+    "current_l3": "1-0:71.7.0",
+    "power_generated_l1": "1-0:22.7.0",
+    "power_generated_l2": "1-0:42.7.0",
+    "power_generated_l3": "1-0:62.7.0",
+}
+
+# Default DSMR serial settings, overridable per device via serial_options
+_DEFAULT_SERIAL = MappingProxyType({
+    "baudrate": 115200,
+    "bytesize": 8,
+    "parity": "N",
+    "stopbits": 1,
+    "timeout": 20,
+})
+
+# Numeric value in the last "(...)" group of a telegram line, e.g.
+# 1-0:1.8.1(001234.567*kWh) or 0-1:24.2.1(101209112500W)(12785.123*m3)
+_OBIS_VALUE = r"(?:\([^)]*\))*\((?P<value>[0-9]+(?:\.[0-9]+)?)(?:\*[^)]*)?\)"
+
+
+def _compile_obis_pattern(parameters: Iterable[str]) -> Tuple[Optional[Pattern[str]], Dict[str, str]]:
+    """
+    Build one regex that matches the telegram lines of the given parameters.
+    
+    Args:
+        parameters: DSMR parameter names to extract
+    
+    Returns:
+        tuple: (compiled pattern or None if no parameter is known, OBIS code -> parameter name)
+    """
+    obis_params = {_OBIS_CODES[param]: param for param in parameters if param in _OBIS_CODES}
+    if not obis_params:
+        return None, obis_params
+    
+    alternatives = "|".join(re.escape(code) for code in obis_params)
+    pattern = re.compile(f"^(?P<obis>{alternatives}){_OBIS_VALUE}", re.MULTILINE)
+    return pattern, obis_params
+
 
 class DSMRDevice(BaseDevice):
     """Device implementation for DSMR (Dutch Smart Meter) electricity meters."""
 
+    __slots__ = (
+        "parser", "reader", "port", "_enabled_params", "_obis_pattern", "_obis_params",
+        "_connection_type", "_serial_settings", "_socket_address", "_model",
+    )
+
+    # Required config keys by connection type
+    _REQUIRED_KEYS: Dict[str, Tuple[str, ...]] = {
+        "serial_port": ("connection", "port"),
+        "network_url": ("connection", "url"),
+    }
+
     def __init__(self, device_id: str, device_config: Dict[str, Any]):
         """
         Initialize DSMR device.
@@ -31,10 +110,19 @@ class DSMRDevice(BaseDevice):
         self.parser = None
         self.reader = None
         self._validate_and_initialize()
+        self._model = f"DSMR {self.device_config.get('version', '50')}"
+        self._enabled_params = tuple(super().get_enabled_parameters())
+        self._obis_pattern, self._obis_params = _compile_obis_pattern(self._enabled_params)
+        
+        unknown = [param for param in self._enabled_params if param not in _OBIS_CODES]
+        if unknown:
+            log.warning(f"Ignoring unknown DSMR parameters for {device_id}: {', '.join(unknown)}")
 
     def _validate_and_initialize(self):
         """Validate config and prepare for connection."""
         connection_type = self.device_config.get("connection", "serial_port")
+        self._connection_type = connection_type
+        self._socket_address = None
         
         if connection_type == "serial_port":
             self.port = self.device_config.get("port")
@@ -44,8 +132,18 @@ class DSMRDevice(BaseDevice):
             self.port = self.device_config.get("url")
             if not self.port:
                 raise ValueError(f"Missing 'url' in config for network connection")
+            
+            # host[:port], optionally prefixed with socket://
+            address = self.port.split("://", 1)[-1]
+            host, sep, port = address.rpartition(":")
+            try:
+                self._socket_address = (host, int(port)) if sep else (address, 23)
+            except ValueError:
+                raise ValueError(f"Invalid port in url: {self.port}")
         else:
             raise ValueError(f"Unknown connection type: {connection_type}")
+        
+        self._serial_settings = {**_DEFAULT_SERIAL, **self.device_config.get("serial_options", {})}
 
     def connect(self) -> bool:
         """
@@ -54,40 +152,29 @@ class DSMRDevice(BaseDevice):
         Returns:
             bool: True if connection successful
         """
+        if not _HAS_DSMR:
+            log.error(f"DSMR device requires 'dsmr-parser' library. Install with: pip install dsmr-parser")
+            return False
+        
         try:
-            from dsmr_parser.clients import SerialReader, SocketReader
-            
             version = self.device_config.get("version", "50")
-            serial_options = self.device_config.get("serial_options", {})
-            
-            # Set default DSMR serial settings if not overridden
-            default_settings = {
-                "baudrate": 115200,
-                "bytesize": 8,
-                "parity": "N",
-                "stopbits": 1,
-                "timeout": 20,
-            }
-            settings = {**default_settings, **serial_options}
+            settings = self._serial_settings
             
             try:
-                connection_type = self.device_config.get("connection", "serial_port")
+                connection_type = self._connection_type
                 
                 if connection_type == "serial_port":
                     self.reader = SerialReader(
                         port=self.port,
-                        baudrate=settings.get("baudrate"),
-                        bytesize=settings.get("bytesize"),
-                        parity=settings.get("parity"),
-                        stopbits=settings.get("stopbits"),
-                        timeout=settings.get("timeout"),
+                        baudrate=settings["baudrate"],
+                        bytesize=settings["bytesize"],
+                        parity=settings["parity"],
+                        stopbits=settings["stopbits"],
+                        timeout=settings["timeout"],
                     )
                 elif connection_type == "network_url":
-                    self.reader = SocketReader(
-                        host=self.port.split(":")[0] if ":" in self.port else self.port,
-                        port=int(self.port.split(":")[1]) if ":" in self.port else 23,
-                        timeout=settings.get("timeout", 20),
-                    )
+                    host, port = self._socket_address
+                    self.reader = SocketReader(host=host, port=port, timeout=settings["timeout"])
                 
                 self.is_connected = True
                 log.info(f"Connected to DSMR meter: {self.device_id} (version={version}, type={connection_type})")
@@ -97,9 +184,6 @@ class DSMRDevice(BaseDevice):
                 log.error(f"Failed to open connection for {self.device_id}: {e}")
                 return False
         
-        except ImportError:
-            log.error(f"DSMR device requires 'dsmr-parser' library. Install with: pip install dsmr-parser")
-            return False
         except Exception as e:
             log.error(f"Connection failed for {self.device_id}: {e}")
             return False
@@ -127,28 +211,19 @@ class DSMRDevice(BaseDevice):
             return None
         
         try:
-            from dsmr_parser import telegram_to_object
-            
             # Read one telegram from DSMR stream
             telegram = self.reader.read_telegram()
             if not telegram:
                 return None
+            if isinstance(telegram, bytes):
+                telegram = telegram.decode("ascii", errors="replace")
             
-            # Parse the telegram
-            result = telegram_to_object(telegram)
-            
-            # Extract enabled parameters
+            # Extract enabled parameters in a single scan of the raw telegram
             values = {}
-            enabled = self.get_enabled_parameters()
-            
-            for param in enabled:
-                if hasattr(result, param):
-                    value = getattr(result, param)
-                    # Handle objects with 'value' attribute
-                    if hasattr(value, 'value'):
-                        values[param] = value.value
-                    else:
-                        values[param] = value
+            if self._obis_pattern is not None:
+                obis_params = self._obis_params
+                for match in self._obis_pattern.finditer(telegram):
+                    values[obis_params[match.group("obis")]] = float(match.group("value"))
             
             return values if values else None
         
@@ -156,7 +231,7 @@ class DSMRDevice(BaseDevice):
             log.error(f"Failed to read from {self.device_id}: {e}")
             return None
 
-    def get_available_parameters(self) -> List[str]:
+    def get_available_parameters(self) -> Tuple[str, ...]:
         """
         Get all available parameters for DSMR.
         
@@ -170,29 +245,24 @@ class DSMRDevice(BaseDevice):
         - current_l1/l2/l3
         
         Returns:
-            list: Parameter names
+            tuple: Parameter names (shared, do not mutate)
+        """
+        return _DSMR_PARAMS
+
+    def has_parameter(self, name: str) -> bool:
+        """Check whether a parameter is available on DSMR meters."""
+        return name in _DSMR_PARAMS_SET
+
+    def get_enabled_parameters(self) -> Tuple[str, ...]:
+        """
+        Get parameters enabled in configuration.
+        
+        Resolved once at init; the device is recreated when its config changes.
+        
+        Returns:
+            tuple: Enabled parameter names
         """
-        # Return common DSMR parameters
-        return [
-            "current_electricity_usage",
-            "current_electricity_delivery",
-            "electricity_used_tariff_1",
-            "electricity_used_tariff_2",
-            "electricity_delivered_tariff_1",
-            "electricity_delivered_tariff_2",
-            "electricity_active_import_total",
-            "electricity_active_export_total",
-            "gas_provided",
-            "voltage_l1",
-            "voltage_l2",
-            "voltage_l3",
-            "current_l1",
-            "current_l2",
-            "current_l3",
-            "power_generated_l1",
-            "power_generated_l2",
-            "power_generated_l3",
-        ]
+        return self._enabled_params
 
     def get_device_type(self) -> str:
         """Get device type identifier."""
@@ -203,16 +273,10 @@ class DSMRDevice(BaseDevice):
         return "Various (DSMR standard)"
 
     def get_model(self) -> str:
-        """Get device model."""
-        version = self.device_config.get("version", "50")
-        return f"DSMR {version}"
+        """Get device model (built once at init)."""
+        return self._model
 
-    def get_required_config_keys(self) -> List[str]:
+    def get_required_config_keys(self) -> Tuple[str, ...]:
         """Get required configuration keys."""
         connection_type = self.device_config.get("connection", "serial_port")
-        required = ["connection"]
-        if connection_type == "serial_port":
-            required.append("port")
-        elif connection_type == "network_url":
-            required.append("url")
-        return required
+        return self._REQUIRED_KEYS.get(connection_type, ("connection",))
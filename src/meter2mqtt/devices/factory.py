@@ -3,6 +3,7 @@
 # Device factory for instantiating device implementations by type
 
 import logging
+import sys
 from typing import Dict, Any, Optional
 from .base import BaseDevice
 
@@ -22,10 +23,47 @@ def register_device_type(device_type: str, device_class: type):
     """
     if not issubclass(device_class, BaseDevice):
         raise TypeError(f"{device_class} must be a subclass of BaseDevice")
-    _DEVICE_REGISTRY[device_type.lower()] = device_class
+    _DEVICE_REGISTRY[sys.intern(device_type.lower())] = device_class
     log.debug(f"Registered device type: {device_type} -> {device_class.__name__}")
 
 
+def resolve_device_class(device_type: str) -> Optional[type]:
+    """
+    Look up the implementation class for a device type.
+    
+    Args:
+        device_type: Device type (e.g., "multical", "dsmr"), case-insensitive
+    
+    Returns:
+        Registered BaseDevice subclass or None if device type not registered
+    """
+    return _DEVICE_REGISTRY.get(device_type) or _DEVICE_REGISTRY.get(device_type.lower())
+
+
+def instantiate_device(device_class: type, device_id: str, device_config: Dict[str, Any]) -> Optional[BaseDevice]:
+    """
+    Create and validate a device instance from a resolved device class.
+    
+    Args:
+        device_class: Class returned by resolve_device_class()
+        device_id: Unique identifier for this device instance
+        device_config: Device-specific configuration dict
+    
+    Returns:
+        BaseDevice instance or None if the config is invalid
+    """
+    try:
+        device = device_class(device_id, device_config)
+        device.validate_config()
+        return device
+    except ValueError as e:
+        log.error(f"Invalid config for device {device_id}: {e}")
+        return None
+    except Exception as e:
+        log.error(f"Failed to create device {device_id}: {e}")
+        return None
+
+
 def create_device(device_id: str, device_type: str, device_config: Dict[str, Any]) -> Optional[BaseDevice]:
     """
     Create a device instance of the specified type.
@@ -41,23 +79,13 @@ def create_device(device_id: str, device_type: str, device_config: Dict[str, Any
     Raises:
         ValueError: If device config is invalid
     """
-    device_type_lower = device_type.lower()
+    device_class = resolve_device_class(device_type)
     
-    if device_type_lower not in _DEVICE_REGISTRY:
+    if device_class is None:
         log.error(f"Unknown device type: {device_type}. Registered types: {list(_DEVICE_REGISTRY.keys())}")
         return None
     
-    try:
-        device_class = _DEVICE_REGISTRY[device_type_lower]
-        device = device_class(device_id, device_config)
-        device.validate_config()
-        return device
-    except ValueError as e:
-        log.error(f"Invalid config for device {device_id}: {e}")
-        return None
-    except Exception as e:
-        log.error(f"Failed to create device {device_id}: {e}")
-        return None
+    return instantiate_device(device_class, device_id, device_config)
 
 
 def get_registered_device_types() -> list:
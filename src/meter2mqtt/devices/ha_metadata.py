@@ -31,413 +31,199 @@ State Classes Reference:
 - total_increasing: Monotonically increasing total (never decreases)
 """
 
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# Shared read-only result for lookups that miss
+_EMPTY: Mapping[str, object] = MappingProxyType({})
+
+
+class _ParameterMetadata(Mapping):
+    """Read-only metadata of one parameter: its display name plus a shared template."""
+
+    __slots__ = ("_name", "_template")
+
+    def __init__(self, name: str, template: Mapping):
+        self._name = name
+        self._template = template
+
+    def __getitem__(self, key):
+        if key == "name":
+            return self._name
+        return self._template[key]
+
+    def __iter__(self):
+        yield "name"
+        yield from self._template
+
+    def __len__(self):
+        return len(self._template) + 1
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _template(unit, icon, device_class, state_class) -> Mapping:
+    """Build a shared metadata template (everything except the name)."""
+    return MappingProxyType({
+        "unit": unit,
+        "icon": icon,
+        "device_class": device_class,
+        "state_class": state_class,
+    })
+
+
+# Short alias for the parameter tables below
+_meta = _ParameterMetadata
+
+# Metadata templates shared by parameters of the same kind
+_ENERGY = _template("kWh", "mdi:flash", "energy", "total_increasing")
+_POWER_W = _template("W", "mdi:lightning-bolt", "power", "measurement")
+_POWER_KW = _template("kW", "mdi:lightning-bolt", "power", "measurement")
+_TEMPERATURE = _template("°C", "mdi:thermometer", "temperature", "measurement")
+_TEMPERATURE_DELTA = _template("°C", "mdi:thermometer-minus", "temperature_delta", "measurement")
+_FLOW = _template("m³/h", "mdi:water-percent", "volume_flow_rate", "measurement")
+_WATER = _template("m³", "mdi:water", "water", "total_increasing")
+_GAS = _template("m³", "mdi:gas-cylinder", None, "total_increasing")
+_VOLTAGE = _template("V", "mdi:flash", "voltage", "measurement")
+_CURRENT = _template("A", "mdi:flash", "current", "measurement")
+_HOURS = _template("h", "mdi:clock", None, "total_increasing")
+_DATE = _template(None, "mdi:calendar", None, None)
+_EVENT = _template(None, "mdi:information", None, None)
+
 # Multical device parameters
 MULTICAL_PARAMS = {
     # Core energy and power parameters
-    "energy": {
-        "name": "Energy",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "power": {
-        "name": "Current Power",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
+    "energy": _meta("Energy", _ENERGY),
+    "power": _meta("Current Power", _POWER_W),
     
     # Temperature parameters
-    "temp1": {
-        "name": "Temperature 1",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
-    "temp2": {
-        "name": "Temperature 2",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
-    "tempdiff": {
-        "name": "Temperature Difference",
-        "unit": "°C",
-        "icon": "mdi:thermometer-minus",
-        "device_class": "temperature_delta",
-        "state_class": "measurement",
-    },
-    "temp1xm3": {
-        "name": "Temperature 1 per m³",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
-    "temp2xm3": {
-        "name": "Temperature 2 per m³",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
+    "temp1": _meta("Temperature 1", _TEMPERATURE),
+    "temp2": _meta("Temperature 2", _TEMPERATURE),
+    "tempdiff": _meta("Temperature Difference", _TEMPERATURE_DELTA),
+    "temp1xm3": _meta("Temperature 1 per m³", _TEMPERATURE),
+    "temp2xm3": _meta("Temperature 2 per m³", _TEMPERATURE),
     
     # Volume and flow parameters
-    "volume": {
-        "name": "Volume",
-        "unit": "m³",
-        "icon": "mdi:water",
-        "device_class": "water",
-        "state_class": "total_increasing",
-    },
-    "flow": {
-        "name": "Flow Rate",
-        "unit": "m³/h",
-        "icon": "mdi:water-percent",
-        "device_class": "volume_flow_rate",
-        "state_class": "measurement",
-    },
+    "volume": _meta("Volume", _WATER),
+    "flow": _meta("Flow Rate", _FLOW),
     
     # Monthly statistics - flow
-    "minflow_m": {
-        "name": "Min Flow (Month)",
-        "unit": "m³/h",
-        "icon": "mdi:water-percent",
-        "device_class": "volume_flow_rate",
-        "state_class": "measurement",
-    },
-    "maxflow_m": {
-        "name": "Max Flow (Month)",
-        "unit": "m³/h",
-        "icon": "mdi:water-percent",
-        "device_class": "volume_flow_rate",
-        "state_class": "measurement",
-    },
-    "minflowDate_m": {
-        "name": "Min Flow Date (Month)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
-    "maxflowDate_m": {
-        "name": "Max Flow Date (Month)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
+    "minflow_m": _meta("Min Flow (Month)", _FLOW),
+    "maxflow_m": _meta("Max Flow (Month)", _FLOW),
+    "minflowDate_m": _meta("Min Flow Date (Month)", _DATE),
+    "maxflowDate_m": _meta("Max Flow Date (Month)", _DATE),
     
     # Monthly statistics - power
-    "minpower_m": {
-        "name": "Min Power (Month)",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "maxpower_m": {
-        "name": "Max Power (Month)",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "minpowerdate_m": {
-        "name": "Min Power Date (Month)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
-    "maxpowerdate_m": {
-        "name": "Max Power Date (Month)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
+    "minpower_m": _meta("Min Power (Month)", _POWER_W),
+    "maxpower_m": _meta("Max Power (Month)", _POWER_W),
+    "minpowerdate_m": _meta("Min Power Date (Month)", _DATE),
+    "maxpowerdate_m": _meta("Max Power Date (Month)", _DATE),
     
     # Monthly statistics - temperatures
-    "avgtemp1_m": {
-        "name": "Average Temperature 1 (Month)",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
-    "avgtemp2_m": {
-        "name": "Average Temperature 2 (Month)",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
+    "avgtemp1_m": _meta("Average Temperature 1 (Month)", _TEMPERATURE),
+    "avgtemp2_m": _meta("Average Temperature 2 (Month)", _TEMPERATURE),
     
     # Yearly statistics - flow
-    "minflow_y": {
-        "name": "Min Flow (Year)",
-        "unit": "m³/h",
-        "icon": "mdi:water-percent",
-        "device_class": "volume_flow_rate",
-        "state_class": "measurement",
-    },
-    "maxflow_y": {
-        "name": "Max Flow (Year)",
-        "unit": "m³/h",
-        "icon": "mdi:water-percent",
-        "device_class": "volume_flow_rate",
-        "state_class": "measurement",
-    },
-    "minflowdate_y": {
-        "name": "Min Flow Date (Year)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
-    "maxflowdate_y": {
-        "name": "Max Flow Date (Year)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
+    "minflow_y": _meta("Min Flow (Year)", _FLOW),
+    "maxflow_y": _meta("Max Flow (Year)", _FLOW),
+    "minflowdate_y": _meta("Min Flow Date (Year)", _DATE),
+    "maxflowdate_y": _meta("Max Flow Date (Year)", _DATE),
     
     # Yearly statistics - power
-    "minpower_y": {
-        "name": "Min Power (Year)",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "maxpower_y": {
-        "name": "Max Power (Year)",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "minpowerdate_y": {
-        "name": "Min Power Date (Year)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
-    "maxpowerdate_y": {
-        "name": "Max Power Date (Year)",
-        "unit": None,
-        "icon": "mdi:calendar",
-        "device_class": None,
-        "state_class": None,
-    },
+    "minpower_y": _meta("Min Power (Year)", _POWER_W),
+    "maxpower_y": _meta("Max Power (Year)", _POWER_W),
+    "minpowerdate_y": _meta("Min Power Date (Year)", _DATE),
+    "maxpowerdate_y": _meta("Max Power Date (Year)", _DATE),
     
     # Yearly statistics - temperatures
-    "avgtemp1_y": {
-        "name": "Average Temperature 1 (Year)",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
-    "avgtemp2_y": {
-        "name": "Average Temperature 2 (Year)",
-        "unit": "°C",
-        "icon": "mdi:thermometer",
-        "device_class": "temperature",
-        "state_class": "measurement",
-    },
+    "avgtemp1_y": _meta("Average Temperature 1 (Year)", _TEMPERATURE),
+    "avgtemp2_y": _meta("Average Temperature 2 (Year)", _TEMPERATURE),
     
     # Other parameters
-    "infoevent": {
-        "name": "Info Event",
-        "unit": None,
-        "icon": "mdi:information",
-        "device_class": None,
-        "state_class": None,
-    },
-    "hourcounter": {
-        "name": "Hour Counter",
-        "unit": "h",
-        "icon": "mdi:clock",
-        "device_class": None,
-        "state_class": "total_increasing",
-    },
-    "e1highres": {
-        "name": "Energy 1 (High Resolution)",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
+    "infoevent": _meta("Info Event", _EVENT),
+    "hourcounter": _meta("Hour Counter", _HOURS),
+    "e1highres": _meta("Energy 1 (High Resolution)", _ENERGY),
 }
 
 # DSMR device parameters
 DSMR_PARAMS = {
     # Electricity usage
-    "current_electricity_usage": {
-        "name": "Current Electricity Usage",
-        "unit": "kW",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "current_electricity_delivery": {
-        "name": "Current Electricity Delivery",
-        "unit": "kW",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "electricity_used_tariff_1": {
-        "name": "Electricity Used (Tariff 1)",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "electricity_used_tariff_2": {
-        "name": "Electricity Used (Tariff 2)",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "electricity_delivered_tariff_1": {
-        "name": "Electricity Delivered (Tariff 1)",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "electricity_delivered_tariff_2": {
-        "name": "Electricity Delivered (Tariff 2)",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "electricity_active_import_total": {
-        "name": "Electricity Active Import Total",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
-    "electricity_active_export_total": {
-        "name": "Electricity Active Export Total",
-        "unit": "kWh",
-        "icon": "mdi:flash",
-        "device_class": "energy",
-        "state_class": "total_increasing",
-    },
+    "current_electricity_usage": _meta("Current Electricity Usage", _POWER_KW),
+    "current_electricity_delivery": _meta("Current Electricity Delivery", _POWER_KW),
+    "electricity_used_tariff_1": _meta("Electricity Used (Tariff 1)", _ENERGY),
+    "electricity_used_tariff_2": _meta("Electricity Used (Tariff 2)", _ENERGY),
+    "electricity_delivered_tariff_1": _meta("Electricity Delivered (Tariff 1)", _ENERGY),
+    "electricity_delivered_tariff_2": _meta("Electricity Delivered (Tariff 2)", _ENERGY),
+    "electricity_active_import_total": _meta("Electricity Active Import Total", _ENERGY),
+    "electricity_active_export_total": _meta("Electricity Active Export Total", _ENERGY),
     
     # Gas
-    "gas_provided": {
-        "name": "Gas Provided",
-        "unit": "m³",
-        "icon": "mdi:gas-cylinder",
-        "device_class": None,
-        "state_class": "total_increasing",
-    },
+    "gas_provided": _meta("Gas Provided", _GAS),
     
     # Voltage
-    "voltage_l1": {
-        "name": "Voltage L1",
-        "unit": "V",
-        "icon": "mdi:flash",
-        "device_class": "voltage",
-        "state_class": "measurement",
-    },
-    "voltage_l2": {
-        "name": "Voltage L2",
-        "unit": "V",
-        "icon": "mdi:flash",
-        "device_class": "voltage",
-        "state_class": "measurement",
-    },
-    "voltage_l3": {
-        "name": "Voltage L3",
-        "unit": "V",
-        "icon": "mdi:flash",
-        "device_class": "voltage",
-        "state_class": "measurement",
-    },
+    "voltage_l1": _meta("Voltage L1", _VOLTAGE),
+    "voltage_l2": _meta("Voltage L2", _VOLTAGE),
+    "voltage_l3": _meta("Voltage L3", _VOLTAGE),
     
     # Current
-    "current_l1": {
-        "name": "Current L1",
-        "unit": "A",
-        "icon": "mdi:flash",
-        "device_class": "current",
-        "state_class": "measurement",
-    },
-    "current_l2": {
-        "name": "Current L2",
-        "unit": "A",
-        "icon": "mdi:flash",
-        "device_class": "current",
-        "state_class": "measurement",
-    },
-    "current_l3": {
-        "name": "Current L3",
-        "unit": "A",
-        "icon": "mdi:flash",
-        "device_class": "current",
-        "state_class": "measurement",
-    },
+    "current_l1": _meta("Current L1", _CURRENT),
+    "current_l2": _meta("Current L2", _CURRENT),
+    "current_l3": _meta("Current L3", _CURRENT),
     
     # Power (per phase)
-    "power_generated_l1": {
-        "name": "Power Generated L1",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "power_generated_l2": {
-        "name": "Power Generated L2",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
-    "power_generated_l3": {
-        "name": "Power Generated L3",
-        "unit": "W",
-        "icon": "mdi:lightning-bolt",
-        "device_class": "power",
-        "state_class": "measurement",
-    },
+    "power_generated_l1": _meta("Power Generated L1", _POWER_W),
+    "power_generated_l2": _meta("Power Generated L2", _POWER_W),
+    "power_generated_l3": _meta("Power Generated L3", _POWER_W),
 }
 
-# Parameter metadata by device type
-PARAMETER_METADATA = {
+# Publish format for float readings by device class (avoids full float repr)
+VALUE_FORMATS = {
+    "energy": ".3f",
+    "power": ".3f",
+    "temperature": ".2f",
+    "temperature_delta": ".2f",
+    "water": ".3f",
+    "volume_flow_rate": ".3f",
+    "voltage": ".1f",
+    "current": ".2f",
+}
+
+# Parameters exempt from their device class format: published via str() so the
+# full resolution of the register is kept
+UNFORMATTED_PARAMETERS = frozenset((
+    "e1highres",
+))
+
+# The tables are shared lookup data: expose them as read-only views
+MULTICAL_PARAMS = MappingProxyType(MULTICAL_PARAMS)
+DSMR_PARAMS = MappingProxyType(DSMR_PARAMS)
+
+# Parameter metadata by device type (keys are the lowercase get_device_type() values)
+PARAMETER_METADATA = MappingProxyType({
     "multical": MULTICAL_PARAMS,
     "dsmr": DSMR_PARAMS,
-}
+})
 
 
-def get_parameter_metadata(device_type: str) -> dict:
+def get_parameter_metadata(device_type: str) -> Mapping[str, Mapping[str, object]]:
     """
     Get parameter metadata for a device type.
     
+    Device types are matched case-insensitively; the canonical lowercase
+    form used by the device classes hits on the first lookup.
+    
     Args:
         device_type: Device type identifier (e.g., "multical", "dsmr")
     
     Returns:
-        dict: Parameter metadata mapping (param_name -> metadata)
+        Mapping: Read-only parameter metadata mapping (param_name -> metadata);
+                 a shared empty mapping for unknown device types
     """
-    return PARAMETER_METADATA.get(device_type.lower(), {})
+    return PARAMETER_METADATA.get(device_type) or PARAMETER_METADATA.get(device_type.lower(), _EMPTY)
 
 
-def get_parameter_info(device_type: str, parameter_name: str) -> dict:
+def get_parameter_info(device_type: str, parameter_name: str) -> Mapping[str, object]:
     """
     Get metadata for a specific parameter.
     
@@ -446,8 +232,27 @@ def get_parameter_info(device_type: str, parameter_name: str) -> dict:
         parameter_name: Parameter name
     
     Returns:
-        dict: Parameter metadata (name, unit, icon, device_class, state_class)
-              Returns empty dict if parameter not found
+        Mapping: Read-only parameter metadata (name, unit, icon, device_class, state_class)
+                 Returns a shared empty mapping if parameter not found
     """
     metadata = get_parameter_metadata(device_type)
-    return metadata.get(parameter_name, {})
+    return metadata.get(parameter_name, _EMPTY)
+
+
+def get_parameter_formats(device_type: str) -> dict:
+    """
+    Get publish format specs for the parameters of a device type.
+    
+    Args:
+        device_type: Device type identifier
+    
+    Returns:
+        dict: Parameter name -> format spec for float values (e.g. ".3f");
+              parameters without a known device class, or listed in
+              UNFORMATTED_PARAMETERS, are not included
+    """
+    return {
+        param_name: VALUE_FORMATS[metadata["device_class"]]
+        for param_name, metadata in get_parameter_metadata(device_type).items()
+        if metadata.get("device_class") in VALUE_FORMATS and param_name not in UNFORMATTED_PARAMETERS
+    }
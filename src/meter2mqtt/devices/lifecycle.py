@@ -3,100 +3,107 @@
 # Device lifecycle manager with dynamic config file watching
 # Handles spawning, reloading, and terminating device processes
 
+import hashlib
 import logging
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
 
 from .base import BaseDevice
-from .factory import create_device
-
-log = logging.getLogger(__name__)
+from .factory import instantiate_device, resolve_device_class
 
+try:
+    from xxhash import xxh3_64 as _xxh3_64
+except ImportError:
+    _xxh3_64 = None
 
-class DeviceConfigWatcher(FileSystemEventHandler):
-    """Watches config.d/ directory for device configuration changes."""
-
-    def __init__(self, lifecycle_manager):
-        """
-        Initialize watcher.
-        
-        Args:
-            lifecycle_manager: Reference to DeviceLifecycleManager
-        """
-        self.lifecycle_manager = lifecycle_manager
-
-    def on_created(self, event):
-        """Handle new config file created."""
-        if event.is_directory:
-            return
-        if self._is_yaml_file(event.src_path):
-            log.debug(f"Config file created: {event.src_path}")
-            self.lifecycle_manager._on_config_change()
-
-    def on_modified(self, event):
-        """Handle config file modified."""
-        if event.is_directory:
-            return
-        if self._is_yaml_file(event.src_path):
-            log.debug(f"Config file modified: {event.src_path}")
-            self.lifecycle_manager._on_config_change()
-
-    def on_deleted(self, event):
-        """Handle config file deleted."""
-        if event.is_directory:
-            return
-        if self._is_yaml_file(event.src_path):
-            log.debug(f"Config file deleted: {event.src_path}")
-            self.lifecycle_manager._on_config_change()
-
-    def on_moved(self, event):
-        """Handle config file moved/renamed."""
-        if event.is_directory:
-            return
-        if self._is_yaml_file(event.dest_path):
-            log.debug(f"Config file moved: {event.src_path} -> {event.dest_path}")
-            self.lifecycle_manager._on_config_change()
+log = logging.getLogger(__name__)
 
-    @staticmethod
-    def _is_yaml_file(path: str) -> bool:
-        """Check if file is a YAML config file."""
-        return path.endswith((".yaml", ".yml"))
+# Upper bound on devices connected concurrently during a reconcile
+_MAX_CONNECT_WORKERS = 16
 
 
 class DeviceLifecycleManager:
     """Manages device lifecycle: spawn, reload, terminate."""
 
-    def __init__(self, config_dir: str = "config.d", reload_delay: float = 1.0):
+    __slots__ = (
+        "config_dir", "reload_delay", "_devices_snapshot", "config_checksums", "config_fingerprints",
+        "_file_index", "_last_configs", "on_device_added", "on_device_removed", "_device_classes", "observer", "_lock",
+        "_reload_cond", "_reload_deadline", "_reload_thread", "_stopping",
+    )
+
+    def __init__(self, config_dir: str = "config.d", reload_delay: float = 1.0,
+                 on_device_added: Optional[Callable[[str, BaseDevice], None]] = None,
+                 on_device_removed: Optional[Callable[[str], None]] = None):
         """
         Initialize lifecycle manager.
         
         Args:
             config_dir: Path to device configs directory
             reload_delay: Delay in seconds before applying config changes (debounce)
+            on_device_added: Optional callback(device_id, device) after a device is started
+            on_device_removed: Optional callback(device_id) after a device is stopped
         """
         self.config_dir = Path(config_dir)
         self.reload_delay = reload_delay
-        self.devices: Dict[str, BaseDevice] = {}
-        self.config_checksums: Dict[str, str] = {}
+        # Running devices, replaced as a whole (copy-on-write) by reconcile and
+        # shutdown so readers never need the lock
+        self._devices_snapshot: Mapping[str, BaseDevice] = MappingProxyType({})
+        self.config_checksums: Dict[str, int] = {}
+        # (st_mtime_ns, st_size) of each device's config file when it was last hashed
+        self.config_fingerprints: Dict[str, Tuple[int, int]] = {}
+        # Config file path -> (fingerprint, device_id, parsed config or None),
+        # so a reload only re-parses files that changed
+        self._file_index: Dict[str, Tuple[Tuple[int, int], str, Optional[dict]]] = {}
+        # (device_id, config) pairs of the last reconcile; holding the config
+        # objects keeps identity comparisons against them valid
+        self._last_configs: Tuple[Tuple[str, dict], ...] = ()
+        self.on_device_added = on_device_added
+        self.on_device_removed = on_device_removed
+        self._device_classes: Dict[str, type] = {}  # device type -> resolved class
         
-        self.observer: Optional[Observer] = None
-        self.reload_timer: Optional[threading.Timer] = None
+        self.observer = None  # watchdog Observer, created by start_watching()
         self._lock = threading.Lock()
+        
+        # Config change notifications are coalesced by a single reload worker:
+        # each change pushes back the monotonic reload deadline
+        self._reload_cond = threading.Condition()
+        self._reload_deadline: Optional[float] = None
+        self._reload_thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def devices(self) -> Mapping[str, BaseDevice]:
+        """Read-only snapshot of the running devices."""
+        return self._devices_snapshot
 
     def start_watching(self):
-        """Start watching config directory for changes."""
+        """
+        Start watching config directory for changes.
+        
+        watchdog is only imported here, so using the manager without
+        hot-reload does not load it.
+        """
+        from watchdog.observers import Observer
+        from .watcher import DeviceConfigWatcher
+        
         if not self.config_dir.exists():
-            log.warning(f"Config directory does not exist: {self.config_dir}")
+            log.warning("Config directory does not exist: %s", self.config_dir)
             self.config_dir.mkdir(parents=True, exist_ok=True)
         
         self.observer = Observer()
         self.observer.schedule(DeviceConfigWatcher(self), str(self.config_dir))
         self.observer.start()
-        log.info(f"Started watching config directory: {self.config_dir}")
+        
+        if self._reload_thread is None:
+            self._reload_thread = threading.Thread(
+                target=self._reload_worker, name="config-reload", daemon=True
+            )
+            self._reload_thread.start()
+        log.info("Started watching config directory: %s", self.config_dir)
 
     def stop_watching(self):
         """Stop watching config directory."""
@@ -104,8 +111,16 @@ class DeviceLifecycleManager:
             self.observer.stop()
             self.observer.join()
             log.info("Stopped watching config directory")
+        
+        if self._reload_thread:
+            with self._reload_cond:
+                self._stopping = True
+                self._reload_cond.notify()
+            self._reload_thread.join(timeout=self.reload_delay + 5)
+            self._reload_thread = None
 
-    def load_and_reconcile_devices(self, device_configs: Dict[str, dict]):
+    def load_and_reconcile_devices(self, device_configs: Dict[str, dict],
+                                   fingerprints: Optional[Dict[str, Tuple[int, int]]] = None):
         """
         Load devices from config and reconcile with running instances.
         
@@ -115,130 +130,348 @@ class DeviceLifecycleManager:
         
         Args:
             device_configs: Dict of device_id -> device_config from load_device_configs()
+            fingerprints: Optional device_id -> (st_mtime_ns, st_size) of the config
+                          file each config was parsed from; lets unchanged files
+                          skip hashing
         """
         with self._lock:
-            log.debug(f"Reconciling devices: found {len(device_configs)} in config")
-            
-            # Get current config file checksums to detect real changes
-            current_checksums = self._compute_config_checksums(device_configs)
+            log.debug("Reconciling devices: found %s in config", len(device_configs))
             
-            # Find devices to add/reload/remove
-            config_ids = set(device_configs.keys())
-            running_ids = set(self.devices.keys())
+            # A reload that re-used every cached config object while all devices
+            # are running has nothing to do
+            configs = tuple(device_configs.items())
+            if self._configs_unchanged(configs):
+                log.debug("Device configs unchanged, skipping reconcile")
+                return
             
-            # Remove devices with deleted configs
-            for device_id in running_ids - config_ids:
-                self._stop_device(device_id)
+            # Get current config file checksums to detect real changes
+            current_checksums = self._compute_config_checksums(device_configs, fingerprints or {})
             
-            # Add/reload devices
-            for device_id, device_config in device_configs.items():
-                checksum = current_checksums.get(device_id)
-                old_checksum = self.config_checksums.get(device_id)
+            # Work on a private copy and publish it in one assignment when done
+            devices = dict(self._devices_snapshot)
+            stop_device = self._stop_device
+            checksums = self.config_checksums
+            info = log.info
+            try:
+                # Find devices to add/reload/remove
+                config_ids = set(device_configs.keys())
+                running_ids = set(devices.keys())
+                
+                # Remove devices with deleted configs
+                for device_id in running_ids - config_ids:
+                    stop_device(device_id, devices)
+                    checksums.pop(device_id, None)
+                
+                # Add/reload devices
+                to_start = []
+                for device_id, device_config in configs:
+                    if device_id not in devices:
+                        # New device
+                        to_start.append((device_id, device_config))
+                    elif current_checksums.get(device_id) != checksums.get(device_id):
+                        # Config changed, reload device
+                        info("Reloading device %s (config changed)", device_id)
+                        stop_device(device_id, devices)
+                        to_start.append((device_id, device_config))
                 
-                if device_id not in self.devices:
-                    # New device
-                    self._start_device(device_id, device_config)
-                    self.config_checksums[device_id] = checksum
-                elif checksum != old_checksum:
-                    # Config changed, reload device
-                    log.info(f"Reloading device {device_id} (config changed)")
-                    self._stop_device(device_id)
-                    self._start_device(device_id, device_config)
-                    self.config_checksums[device_id] = checksum
+                if to_start:
+                    self._start_devices(to_start, devices)
+                    for device_id, _ in to_start:
+                        checksums[device_id] = current_checksums.get(device_id)
+            finally:
+                self._devices_snapshot = MappingProxyType(devices)
+                self._last_configs = configs
 
-    def _start_device(self, device_id: str, device_config: dict):
+    def _configs_unchanged(self, configs: Tuple[Tuple[str, dict], ...]) -> bool:
         """
-        Start a device.
+        Check whether a reconcile would be a no-op.
+        
+        Args:
+            configs: (device_id, device_config) pairs about to be reconciled
+        
+        Returns:
+            bool: True if the configs are the very objects of the last reconcile
+                  and every configured device is running
+        """
+        last = self._last_configs
+        if len(configs) != len(last):
+            return False
+        for (device_id, config), (last_id, last_config) in zip(configs, last):
+            if device_id != last_id or config is not last_config:
+                return False
+        running = self._devices_snapshot
+        return all(device_id in running for device_id, _ in configs)
+
+    def _build_and_connect(self, device_id: str, device_config: dict) -> Optional[BaseDevice]:
+        """
+        Create and connect a device without registering it.
+        
+        Runs on the connect pool, so it must not touch the device map.
         
         Args:
             device_id: Device identifier
             device_config: Device configuration dict
+        
+        Returns:
+            BaseDevice: Connected device, or None on failure
         """
         try:
             device_type = device_config.get("type")
-            device = create_device(device_id, device_type, device_config)
+            device_class = self._device_classes.get(device_type)
+            if device_class is None:
+                device_class = resolve_device_class(device_type)
+                if device_class is None:
+                    log.error("Unknown device type for %s: %s", device_id, device_type)
+                    return None
+                self._device_classes[device_type] = device_class
+            
+            device = instantiate_device(device_class, device_id, device_config)
             
             if device is None:
-                log.error(f"Failed to create device: {device_id}")
-                return
+                log.error("Failed to create device: %s", device_id)
+                return None
             
             if not device.connect():
-                log.error(f"Failed to connect device: {device_id}")
-                return
+                log.error("Failed to connect device: %s", device_id)
+                return None
             
-            self.devices[device_id] = device
-            log.info(f"Started device: {device_id} ({device.get_device_type()})")
+            return device
         
         except Exception as e:
-            log.error(f"Error starting device {device_id}: {e}")
+            log.error("Error starting device %s: %s", device_id, e)
+            return None
 
-    def _stop_device(self, device_id: str):
+    def _start_devices(self, to_start: List[Tuple[str, dict]], devices: Dict[str, BaseDevice]):
+        """
+        Start devices, connecting them concurrently.
+        
+        Connecting is blocking serial/socket I/O, so it runs on a thread pool;
+        registering the connected devices happens on the calling thread.
+        
+        Args:
+            to_start: List of (device_id, device_config) to start
+            devices: Working copy of the running devices to add them to
+        """
+        if len(to_start) == 1:
+            device_id, device_config = to_start[0]
+            self._commit_device(device_id, self._build_and_connect(device_id, device_config), devices)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(_MAX_CONNECT_WORKERS, len(to_start)),
+                                thread_name_prefix="device-connect") as pool:
+            futures = {
+                pool.submit(self._build_and_connect, device_id, device_config): device_id
+                for device_id, device_config in to_start
+            }
+            for future in as_completed(futures):
+                self._commit_device(futures[future], future.result(), devices)
+
+    def _commit_device(self, device_id: str, device: Optional[BaseDevice], devices: Dict[str, BaseDevice]):
+        """
+        Register a started device.
+        
+        Args:
+            device_id: Device identifier
+            device: Connected device, or None if starting it failed
+            devices: Working copy of the running devices to add it to
+        """
+        if device is None:
+            return
+        
+        try:
+            devices[device_id] = device
+            log.info("Started device: %s (%s)", device_id, device.get_device_type())
+            
+            if self.on_device_added:
+                self.on_device_added(device_id, device)
+        
+        except Exception as e:
+            log.error("Error starting device %s: %s", device_id, e)
+
+    def _stop_device(self, device_id: str, devices: Dict[str, BaseDevice]):
         """
         Stop a device.
         
         Args:
             device_id: Device identifier
+            devices: Working copy of the running devices to remove it from
         """
         try:
-            if device_id in self.devices:
-                device = self.devices[device_id]
+            if device_id in devices:
+                device = devices[device_id]
                 device.disconnect()
-                del self.devices[device_id]
-                log.info(f"Stopped device: {device_id}")
-            
-            if device_id in self.config_checksums:
-                del self.config_checksums[device_id]
+                del devices[device_id]
+                log.info("Stopped device: %s", device_id)
+                
+                if self.on_device_removed:
+                    self.on_device_removed(device_id)
         
         except Exception as e:
-            log.error(f"Error stopping device {device_id}: {e}")
+            log.error("Error stopping device %s: %s", device_id, e)
 
     def get_device(self, device_id: str) -> Optional[BaseDevice]:
         """Get a device by ID."""
-        return self.devices.get(device_id)
+        return self._devices_snapshot.get(device_id)
 
-    def get_all_devices(self) -> Dict[str, BaseDevice]:
-        """Get all active devices."""
-        return self.devices.copy()
+    def get_all_devices(self) -> Mapping[str, BaseDevice]:
+        """
+        Get all active devices.
+        
+        Returns:
+            Mapping: Read-only snapshot of device_id -> device. It is never
+                     modified in place; later starts/stops replace it, so
+                     call again for the current state.
+        """
+        return self._devices_snapshot
 
     def _on_config_change(self):
-        """Handle config file change (debounced)."""
-        with self._lock:
-            # Cancel pending reload if any
-            if self.reload_timer:
-                self.reload_timer.cancel()
-            
-            # Schedule new reload with debounce delay
-            self.reload_timer = threading.Timer(self.reload_delay, self._reload_all)
-            self.reload_timer.start()
+        """Handle config file change (debounced by the reload worker)."""
+        with self._reload_cond:
+            self._reload_deadline = time.monotonic() + self.reload_delay
+            self._reload_cond.notify()
+
+    def _reload_worker(self):
+        """
+        Apply config changes once they settle.
+        
+        The worker reloads when reload_delay seconds have passed since the
+        last change notification, so a burst of events (editors often emit
+        several per save) results in a single reload.
+        """
+        cond = self._reload_cond
+        while True:
+            with cond:
+                while not self._stopping:
+                    if self._reload_deadline is None:
+                        cond.wait()
+                        continue
+                    remaining = self._reload_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    cond.wait(remaining)
+                if self._stopping:
+                    return
+                self._reload_deadline = None
+            self._reload_all()
 
     def _reload_all(self):
-        """Reload all device configurations (called after debounce)."""
+        """
+        Reload all device configurations (called by the reload worker).
+        
+        Only files whose mtime or size changed since the previous reload are
+        parsed again; the others reuse the config loaded from them last time.
+        """
         try:
-            from ..config import load_device_configs
-            device_configs = load_device_configs(str(self.config_dir))
-            self.load_and_reconcile_devices(device_configs)
+            from ..handlers.config import load_device_config
+            
+            file_index = {}
+            device_configs = {}
+            fingerprints = {}
+            for device_id, (path, fingerprint) in self._scan_config_files().items():
+                indexed = self._file_index.get(path)
+                if indexed is not None and indexed[0] == fingerprint:
+                    device_config = indexed[2]
+                else:
+                    device_config = load_device_config(path)
+                file_index[path] = (fingerprint, device_id, device_config)
+                if device_config is not None:
+                    device_configs[device_id] = device_config
+                    fingerprints[device_id] = fingerprint
+            self._file_index = file_index
+            
+            self.load_and_reconcile_devices(device_configs, fingerprints)
         except Exception as e:
-            log.error(f"Error reloading device configs: {e}")
+            log.error("Error reloading device configs: %s", e)
+
+    def _scan_config_files(self) -> Dict[str, Tuple[str, Tuple[int, int]]]:
+        """
+        Scan the config directory for device config files.
+        
+        Returns:
+            dict: device_id -> (path, (st_mtime_ns, st_size)) in load order, for
+                  the files load_device_configs() would load
+        """
+        from ..handlers.config import scan_device_config_files
+        
+        files = {}
+        try:
+            for device_id, entry in scan_device_config_files(self.config_dir).items():
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files[device_id] = (entry.path, (st.st_mtime_ns, st.st_size))
+        except OSError as e:
+            log.debug("Cannot scan config directory %s: %s", self.config_dir, e)
+        return files
 
-    def _compute_config_checksums(self, device_configs: Dict[str, dict]) -> Dict[str, str]:
-        """Compute checksums for device configs to detect real changes."""
-        import hashlib
-        import json
+    def _compute_config_checksums(self, device_configs: Dict[str, dict],
+                                  fingerprints: Dict[str, Tuple[int, int]]) -> Dict[str, int]:
+        """
+        Compute checksums for device configs to detect real changes.
+        
+        A device whose config file has the same mtime and size as when it was
+        last hashed keeps its previous checksum; only the other configs are
+        hashed, so touching a file without changing its content is not a reload.
+        
+        Args:
+            device_configs: Dict of device_id -> device_config
+            fingerprints: device_id -> fingerprint of the file each config was
+                          parsed from (taken by the same scan)
+        
+        Returns:
+            dict: device_id -> checksum
+        """
         checksums = {}
+        hashed_fingerprints = {}
         for device_id, config in device_configs.items():
-            # Create checksum from config (excluding comments)
-            config_str = json.dumps(config, sort_keys=True)
-            checksum = hashlib.md5(config_str.encode()).hexdigest()
-            checksums[device_id] = checksum
+            fingerprint = fingerprints.get(device_id)
+            old_checksum = self.config_checksums.get(device_id)
+            if fingerprint is not None and old_checksum is not None \
+                    and fingerprint == self.config_fingerprints.get(device_id):
+                checksums[device_id] = old_checksum
+            else:
+                checksums[device_id] = self._config_checksum(config)
+            if fingerprint is not None:
+                hashed_fingerprints[device_id] = fingerprint
+        self.config_fingerprints = hashed_fingerprints
         return checksums
 
+    @staticmethod
+    def _config_checksum(config: dict) -> int:
+        """
+        Hash a device config independent of its top-level key order.
+        
+        Keys and value reprs are streamed into the hasher in sorted key order
+        rather than serialising the whole config to one string first. The
+        checksum only detects changes, so a non-cryptographic digest is fine.
+        
+        Args:
+            config: Device configuration dict
+        
+        Returns:
+            int: 64-bit digest (xxh3 when xxhash is installed, else blake2b)
+        """
+        hasher = _xxh3_64() if _xxh3_64 is not None else hashlib.blake2b(digest_size=8)
+        for key in sorted(config, key=str):
+            hasher.update(str(key).encode())
+            hasher.update(b"\0")
+            hasher.update(repr(config[key]).encode())
+            hasher.update(b"\0")
+        return int.from_bytes(hasher.digest(), "little")
+
     def shutdown(self):
         """Shut down all devices and stop watching."""
         self.stop_watching()
         
         with self._lock:
-            device_ids = list(self.devices.keys())
-            for device_id in device_ids:
-                self._stop_device(device_id)
+            devices = dict(self._devices_snapshot)
+            try:
+                for device_id in list(devices):
+                    self._stop_device(device_id, devices)
+                self.config_checksums.clear()
+                self.config_fingerprints.clear()
+            finally:
+                self._devices_snapshot = MappingProxyType(devices)
         
         log.info("Device lifecycle manager shut down")
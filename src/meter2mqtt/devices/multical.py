@@ -4,15 +4,33 @@
 # Adapter for Kamstrup Multical heat meters
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, Optional, Any, Tuple
 from .base import BaseDevice
+from .ha_metadata import MULTICAL_PARAMS
+
+try:
+    from kamstrup2mqtt.parser import kamstrup_parser
+except ImportError:
+    kamstrup_parser = None
 
 log = logging.getLogger(__name__)
 
+# All Multical parameters; the HA metadata table is the single source of truth
+_AVAILABLE_PARAMETERS: Tuple[str, ...] = tuple(MULTICAL_PARAMS)
+_AVAILABLE_PARAMETERS_SET: FrozenSet[str] = frozenset(_AVAILABLE_PARAMETERS)
+
 
 class MulticalDevice(BaseDevice):
     """Device implementation for Kamstrup Multical heat meters."""
 
+    __slots__ = ("parser", "port", "_model")
+
+    # Required config keys by connection type
+    _REQUIRED_KEYS: Dict[str, Tuple[str, ...]] = {
+        "serial_port": ("connection", "port"),
+        "network_url": ("connection", "url"),
+    }
+
     def __init__(self, device_id: str, device_config: Dict[str, Any]):
         """
         Initialize Multical device.
@@ -30,6 +48,7 @@ class MulticalDevice(BaseDevice):
         super().__init__(device_id, device_config)
         self.parser = None
         self._validate_and_initialize()
+        self._model = f"Multical {self.device_config.get('version', '402')}"
 
     def _validate_and_initialize(self):
         """Validate config and prepare for connection."""
@@ -53,14 +72,11 @@ class MulticalDevice(BaseDevice):
         Returns:
             bool: True if connection successful
         """
+        if kamstrup_parser is None:
+            log.error("Multical device requires 'kamstrup2mqtt' library. Install with: pip install kamstrup2mqtt")
+            return False
+        
         try:
-            # Import inside method to handle optional dependency
-            try:
-                from kamstrup2mqtt.parser import kamstrup_parser
-            except ImportError:
-                log.error(f"Multical device requires 'kamstrup2mqtt' library. Install with: pip install kamstrup2mqtt")
-                return False
-            
             version = self.device_config.get("version", "402")
             params = self.device_config.get("parameters", [])
             serial_options = self.device_config.get("serial_options", {})
@@ -74,15 +90,15 @@ class MulticalDevice(BaseDevice):
                 )
                 
                 self.is_connected = True
-                log.info(f"Connected to Multical meter: {self.device_id} (version={version}, port={self.port})")
+                log.info("Connected to Multical meter: %s (version=%s, port=%s)", self.device_id, version, self.port)
                 return True
             
             except Exception as e:
-                log.error(f"Failed to initialize Multical parser for {self.device_id}: {e}")
+                log.error("Failed to initialize Multical parser for %s: %s", self.device_id, e)
                 return False
         
         except Exception as e:
-            log.error(f"Connection failed for {self.device_id}: {e}")
+            log.error("Connection failed for %s: %s", self.device_id, e)
             return False
 
     def disconnect(self):
@@ -91,9 +107,9 @@ class MulticalDevice(BaseDevice):
             if self.parser:
                 self.parser.close()
             self.is_connected = False
-            log.debug(f"Disconnected from {self.device_id}")
+            log.debug("Disconnected from %s", self.device_id)
         except Exception as e:
-            log.error(f"Error disconnecting {self.device_id}: {e}")
+            log.error("Error disconnecting %s: %s", self.device_id, e)
 
     def read(self) -> Optional[Dict[str, Any]]:
         """
@@ -104,7 +120,7 @@ class MulticalDevice(BaseDevice):
             None if read fails
         """
         if not self.is_connected or not self.parser:
-            log.warning(f"Cannot read {self.device_id}: not connected")
+            log.warning("Cannot read %s: not connected", self.device_id)
             return None
         
         try:
@@ -112,10 +128,10 @@ class MulticalDevice(BaseDevice):
             return values if values else None
         
         except Exception as e:
-            log.error(f"Failed to read from {self.device_id}: {e}")
+            log.error("Failed to read from %s: %s", self.device_id, e)
             return None
 
-    def get_available_parameters(self) -> List[str]:
+    def get_available_parameters(self) -> Tuple[str, ...]:
         """
         Get all available parameters for Multical.
         
@@ -126,49 +142,13 @@ class MulticalDevice(BaseDevice):
         - Other: temp1xm3, temp2xm3, infoevent, hourcounter
         
         Returns:
-            list: Parameter names
+            tuple: Parameter names (shared, do not mutate)
         """
-        return [
-            # Core parameters
-            "energy",
-            "power",
-            "temp1",
-            "temp2",
-            "volume",
-            "flow",
-            "tempdiff",
-            "temp1xm3",
-            "temp2xm3",
-            
-            # Monthly statistics
-            "minflow_m",
-            "maxflow_m",
-            "minflowDate_m",
-            "maxflowDate_m",
-            "minpower_m",
-            "maxpower_m",
-            "minpowerdate_m",
-            "maxpowerdate_m",
-            "avgtemp1_m",
-            "avgtemp2_m",
-            
-            # Yearly statistics
-            "minflow_y",
-            "maxflow_y",
-            "minflowdate_y",
-            "maxflowdate_y",
-            "minpower_y",
-            "maxpower_y",
-            "minpowerdate_y",
-            "maxpowerdate_y",
-            "avgtemp1_y",
-            "avgtemp2_y",
-            
-            # Other parameters
-            "infoevent",
-            "hourcounter",
-            "e1highres",
-        ]
+        return _AVAILABLE_PARAMETERS
+
+    def has_parameter(self, name: str) -> bool:
+        """Check whether a parameter is available on Multical meters."""
+        return name in _AVAILABLE_PARAMETERS_SET
 
     def get_device_type(self) -> str:
         """Get device type identifier."""
@@ -179,16 +159,10 @@ class MulticalDevice(BaseDevice):
         return "Kamstrup"
 
     def get_model(self) -> str:
-        """Get device model."""
-        version = self.device_config.get("version", "402")
-        return f"Multical {version}"
+        """Get device model (built once at init)."""
+        return self._model
 
-    def get_required_config_keys(self) -> List[str]:
+    def get_required_config_keys(self) -> Tuple[str, ...]:
         """Get required configuration keys."""
         connection_type = self.device_config.get("connection", "serial_port")
-        required = ["connection"]
-        if connection_type == "serial_port":
-            required.append("port")
-        elif connection_type == "network_url":
-            required.append("url")
-        return required
+        return self._REQUIRED_KEYS.get(connection_type, ("connection",))
@@ -0,0 +1,39 @@
+#!/usr/bin/python
+#
+# Config directory watcher for the device lifecycle manager
+# Imported lazily by DeviceLifecycleManager.start_watching()
+
+import logging
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    PatternMatchingEventHandler,
+)
+
+log = logging.getLogger(__name__)
+
+
+class DeviceConfigWatcher(PatternMatchingEventHandler):
+    """Watches config.d/ directory for device configuration changes."""
+
+    # Event types that can change the loaded configs (opened/closed events
+    # are ignored, otherwise reading the configs would trigger another reload)
+    _CHANGE_EVENTS = frozenset((EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_DELETED, EVENT_TYPE_MOVED))
+
+    def __init__(self, lifecycle_manager):
+        """
+        Initialize watcher.
+        
+        Args:
+            lifecycle_manager: Reference to DeviceLifecycleManager
+        """
+        super().__init__(patterns=["*.yaml", "*.yml"], ignore_directories=True)
+        self.lifecycle_manager = lifecycle_manager
+
+    def on_any_event(self, event):
+        """Handle a YAML config file being created, modified, deleted or moved."""
+        if event.event_type in self._CHANGE_EVENTS:
+            log.debug("Config file %s: %s", event.event_type, event.src_path)
+            self.lifecycle_manager._on_config_change()
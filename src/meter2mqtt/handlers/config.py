@@ -3,15 +3,71 @@
 # Configuration management for meter2mqtt
 # Supports base config + dynamic per-device configs from config.d/
 
+import copy
 import logging
-import yaml
 import os
-import ssl
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
+# yaml and ssl are imported where they are used, so importing this module
+# stays cheap and TLS support is only loaded when it is configured
+
+
+@lru_cache(maxsize=1)
+def _yaml_loader():
+    """libyaml's C loader when PyYAML was built with it; same semantics as SafeLoader."""
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# A "type" mapping key anywhere in a device file (block or flow style, optionally
+# quoted). Files without one cannot be valid device configs and are not parsed.
+_TYPE_KEY = re.compile(rb"""\btype["']?[ \t]*:""")
+
+# Parsed YAML documents by path: path -> (st_mtime_ns, st_size, document)
+_CONFIG_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+
+def _load_yaml(path, required_key: Optional[re.Pattern] = None) -> Any:
+    """
+    Parse a YAML file, reusing the previous result while the file is unchanged.
+    
+    A file counts as unchanged while its (st_mtime_ns, st_size) match the
+    cached entry. Callers get a deep copy, so the cached document is never
+    mutated by the config code that post-processes it.
+    
+    Args:
+        path: Path to the YAML file
+        required_key: Optional pattern the raw file must match; a non-empty
+                      file without a match loads as {} without being parsed
+    
+    Returns:
+        The parsed document (None for an empty file)
+    
+    Raises:
+        OSError: If the file cannot be read
+        yaml.YAMLError: If the file is not valid YAML
+    """
+    import yaml
+    
+    path = os.fspath(path)
+    st = os.stat(path)
+    cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        document = cached[2]
+    else:
+        data = Path(path).read_bytes()
+        if required_key is not None and data.strip() and required_key.search(data) is None:
+            document = {}
+        else:
+            document = yaml.load(data, Loader=_yaml_loader())
+        _CONFIG_CACHE[path] = (st.st_mtime_ns, st.st_size, document)
+    return copy.deepcopy(document)
+
 
 def load_base_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     """
@@ -31,11 +87,12 @@ def load_base_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     Returns:
         dict: Parsed configuration with environment variable overrides applied
     """
+    import yaml
+    
     config = {}
     if os.path.exists(config_path):
         try:
-            with open(config_path, "r") as f:
-                config = yaml.safe_load(f)
+            config = _load_yaml(config_path)
             
             if config is None:
                 config = {}
@@ -81,33 +138,127 @@ def load_device_configs(config_dir: str = "config.d") -> Dict[str, Dict[str, Any
         log.error(f"Config path is not a directory: {config_dir}")
         return devices
     
-    # Find all YAML files in config.d/
-    yaml_files = sorted(config_path.glob("*.yaml")) + sorted(config_path.glob("*.yml"))
+    for device_id, entry in scan_device_config_files(config_dir).items():
+        device_config = load_device_config(entry.path)
+        if device_config is not None:
+            devices[device_id] = device_config
+    
+    return devices
+
+
+def scan_device_config_files(config_dir: str) -> Dict[str, os.DirEntry]:
+    """
+    Find the device config files in config.d/ with a single directory read.
+    
+    Args:
+        config_dir: Path to devices config directory
+    
+    Returns:
+        dict: device_id (filename without extension) -> DirEntry, in file name
+              order; a .yml file takes precedence over a .yaml file of the same name
+    
+    Raises:
+        OSError: If the directory cannot be read
+    """
+    files = {}
+    with os.scandir(config_dir) as entries:
+        # "x.yaml" sorts before "x.yml", so the .yml entry is assigned last
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if entry.name.endswith((".yaml", ".yml")) and entry.is_file():
+                files[os.path.splitext(entry.name)[0]] = entry
+    
+    # Forget parsed documents of files in this directory that are gone or shadowed
+    directory = os.path.dirname(os.path.join(os.fspath(config_dir), ""))
+    live = {entry.path for entry in files.values()}
+    for path in list(_CONFIG_CACHE):
+        if path not in live and os.path.dirname(path) == directory:
+            _CONFIG_CACHE.pop(path, None)
+    return files
+
+
+def load_device_config(config_file) -> Optional[Dict[str, Any]]:
+    """
+    Load a single device configuration file.
+    
+    Args:
+        config_file: Path to the device's YAML file
     
-    for config_file in yaml_files:
-        device_id = config_file.stem  # filename without extension
+    Returns:
+        dict: Device config, or None if the file is empty, invalid or has no 'type'
+    """
+    import yaml
+    
+    try:
+        device_config = _load_yaml(config_file, _TYPE_KEY)
         
-        try:
-            with open(config_file, "r") as f:
-                device_config = yaml.safe_load(f)
-            
-            if device_config is None:
-                log.warning(f"Device config file is empty: {config_file}")
-                continue
-            
-            if "type" not in device_config:
-                log.error(f"Device config missing 'type' field: {config_file}")
-                continue
-            
-            devices[device_id] = device_config
-            log.debug(f"Loaded device config: {device_id} (type={device_config.get('type')})")
+        if device_config is None:
+            log.warning(f"Device config file is empty: {config_file}")
+            return None
         
-        except yaml.YAMLError as e:
-            log.error(f"Error parsing device config {config_file}: {e}")
-        except Exception as e:
-            log.error(f"Error loading device config {config_file}: {e}")
+        if "type" not in device_config:
+            log.error(f"Device config missing 'type' field: {config_file}")
+            return None
+        
+        log.debug(f"Loaded device config: {Path(config_file).stem} (type={device_config.get('type')})")
+        return device_config
     
-    return devices
+    except yaml.YAMLError as e:
+        log.error(f"Error parsing device config {config_file}: {e}")
+    except Exception as e:
+        log.error(f"Error loading device config {config_file}: {e}")
+    return None
+
+
+# Environment variable values that enable a boolean setting (case-insensitive)
+_TRUTHY = frozenset(("true", "1", "yes", "on"))
+
+
+def _to_bool(value: str) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    return value.lower() in _TRUTHY
+
+
+# Environment variable overrides: (env var, config section, config key, converter)
+_ENV_OVERRIDES = (
+    # MQTT configuration overrides
+    ("MQTT_HOST", "mqtt", "host", str),
+    ("MQTT_PORT", "mqtt", "port", int),
+    ("MQTT_CLIENT", "mqtt", "client", str),
+    ("MQTT_QOS", "mqtt", "qos", int),
+    ("MQTT_RETAIN", "mqtt", "retain", _to_bool),
+    ("MQTT_AUTHENTICATION", "mqtt", "authentication", _to_bool),
+    ("MQTT_USERNAME", "mqtt", "username", str),
+    ("MQTT_PASSWORD", "mqtt", "password", str),
+    ("MQTT_TLS_ENABLED", "mqtt", "tls_enabled", _to_bool),
+    ("MQTT_TLS_CA_CERT", "mqtt", "tls_ca_cert", str),
+    ("MQTT_TLS_CERT", "mqtt", "tls_cert", str),
+    ("MQTT_TLS_KEY", "mqtt", "tls_key", str),
+    ("MQTT_TLS_KEY_PASSWORD", "mqtt", "tls_key_password", str),
+    ("MQTT_TLS_INSECURE", "mqtt", "tls_insecure", _to_bool),
+    ("MQTT_TLS_VERSION", "mqtt", "tls_version", str),
+    ("MQTT_TOPIC_PREFIX", "mqtt", "topic_prefix", str),
+    # Logging level override
+    ("LOG_LEVEL", "logging", "level", str),
+)
+
+
+@lru_cache(maxsize=1)
+def _build_env_overlay() -> Dict[str, Dict[str, Any]]:
+    """
+    Collect the environment variable overrides.
+    
+    The environment is read once per process; call
+    _build_env_overlay.cache_clear() to pick up changes.
+    
+    Returns:
+        dict: Config section -> {key: converted value} (shared, do not mutate)
+    """
+    overlay = {"mqtt": {}, "logging": {}}
+    for env_key, section, key, coerce in _ENV_OVERRIDES:
+        value = os.environ.get(env_key)
+        if value is not None:
+            overlay[section][key] = coerce(value)
+    return overlay
 
 
 def _apply_env_overrides(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -126,43 +277,10 @@ def _apply_env_overrides(config: Dict[str, Any]) -> Dict[str, Any]:
     if "logging" not in config:
         config["logging"] = {}
     
-    # MQTT configuration overrides
-    if "MQTT_HOST" in os.environ:
-        config["mqtt"]["host"] = os.getenv("MQTT_HOST")
-    if "MQTT_PORT" in os.environ:
-        config["mqtt"]["port"] = int(os.getenv("MQTT_PORT"))
-    if "MQTT_CLIENT" in os.environ:
-        config["mqtt"]["client"] = os.getenv("MQTT_CLIENT")
-    if "MQTT_QOS" in os.environ:
-        config["mqtt"]["qos"] = int(os.getenv("MQTT_QOS"))
-    if "MQTT_RETAIN" in os.environ:
-        config["mqtt"]["retain"] = os.getenv("MQTT_RETAIN").lower() in ("true", "1", "yes")
-    if "MQTT_AUTHENTICATION" in os.environ:
-        config["mqtt"]["authentication"] = os.getenv("MQTT_AUTHENTICATION").lower() in ("true", "1", "yes")
-    if "MQTT_USERNAME" in os.environ:
-        config["mqtt"]["username"] = os.getenv("MQTT_USERNAME")
-    if "MQTT_PASSWORD" in os.environ:
-        config["mqtt"]["password"] = os.getenv("MQTT_PASSWORD")
-    if "MQTT_TLS_ENABLED" in os.environ:
-        config["mqtt"]["tls_enabled"] = os.getenv("MQTT_TLS_ENABLED").lower() in ("true", "1", "yes")
-    if "MQTT_TLS_CA_CERT" in os.environ:
-        config["mqtt"]["tls_ca_cert"] = os.getenv("MQTT_TLS_CA_CERT")
-    if "MQTT_TLS_CERT" in os.environ:
-        config["mqtt"]["tls_cert"] = os.getenv("MQTT_TLS_CERT")
-    if "MQTT_TLS_KEY" in os.environ:
-        config["mqtt"]["tls_key"] = os.getenv("MQTT_TLS_KEY")
-    if "MQTT_TLS_KEY_PASSWORD" in os.environ:
-        config["mqtt"]["tls_key_password"] = os.getenv("MQTT_TLS_KEY_PASSWORD")
-    if "MQTT_TLS_INSECURE" in os.environ:
-        config["mqtt"]["tls_insecure"] = os.getenv("MQTT_TLS_INSECURE").lower() in ("true", "1", "yes")
-    if "MQTT_TLS_VERSION" in os.environ:
-        config["mqtt"]["tls_version"] = os.getenv("MQTT_TLS_VERSION")
-    if "MQTT_TOPIC_PREFIX" in os.environ:
-        config["mqtt"]["topic_prefix"] = os.getenv("MQTT_TOPIC_PREFIX")
-    
-    # Logging level override
-    if "LOG_LEVEL" in os.environ:
-        config["logging"]["level"] = os.getenv("LOG_LEVEL")
+    for section, values in _build_env_overlay().items():
+        if values:
+            # An empty YAML section (all entries commented out) loads as None
+            config[section] = {**(config[section] or {}), **values}
     
     return config
 
@@ -193,6 +311,8 @@ def get_mqtt_config(config: Dict[str, Any]) -> Dict[str, Any]:
     
     # TLS configuration
     if mqtt_config.get("tls_enabled"):
+        import ssl
+        
         tls_params = {
             "ca_certs": mqtt_config.get("tls_ca_cert"),
             "certfile": mqtt_config.get("tls_cert"),
@@ -208,10 +328,18 @@ def get_mqtt_config(config: Dict[str, Any]) -> Dict[str, Any]:
     paho_config["qos"] = mqtt_config.get("qos", 1)
     paho_config["retain"] = mqtt_config.get("retain", True)
     paho_config["topic_prefix"] = mqtt_config.get("topic_prefix", "meters")
+    paho_config["force_republish_interval"] = mqtt_config.get("force_republish_interval", 300)
     
     return paho_config
 
 
+@lru_cache(maxsize=1)
+def _tls_versions() -> Dict[str, Any]:
+    """TLS protocol constants by name, as accepted for mqtt.tls_version."""
+    import ssl
+    return {name: getattr(ssl, name) for name in dir(ssl) if name.startswith("PROTOCOL_")}
+
+
 def _parse_tls_version(tls_version_str: str) -> any:
     """
     Parse TLS version string to ssl module constant.
@@ -222,14 +350,16 @@ def _parse_tls_version(tls_version_str: str) -> any:
     Returns:
         SSL protocol constant, defaults to PROTOCOL_TLS
     """
+    import ssl
+    
     if not tls_version_str:
         return ssl.PROTOCOL_TLS
     
-    try:
-        return getattr(ssl, tls_version_str)
-    except AttributeError:
+    tls_version = _tls_versions().get(tls_version_str)
+    if tls_version is None:
         log.warning(f"Unknown TLS version: {tls_version_str}, using default")
         return ssl.PROTOCOL_TLS
+    return tls_version
 
 
 def get_logging_config(config: Dict[str, Any]) -> Dict[str, Any]:
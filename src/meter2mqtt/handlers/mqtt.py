@@ -4,15 +4,88 @@
 
 import logging
 import json
+import socket
+import threading
 import paho.mqtt.client as paho
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _entity_discovery_payload(topic_prefix: str, device_id: str, param_name: str,
+                              metadata_items: Tuple[Tuple[str, Any], ...],
+                              device_json: bytes) -> bytes:
+    """
+    Build the encoded Home Assistant discovery payload for one entity.
+    
+    All arguments are hashable so repeated discoveries (reconnects, reloads)
+    reuse the serialized payload instead of calling json.dumps again. The
+    device block is identical for all entities of a device, so it is
+    serialized once by the caller and spliced in.
+    
+    Args:
+        topic_prefix: MQTT topic prefix
+        device_id: Device identifier
+        param_name: Parameter name
+        metadata_items: Parameter metadata as a tuple of (key, value) pairs
+        device_json: Encoded Home Assistant device object
+    
+    Returns:
+        bytes: UTF-8 encoded JSON payload
+    """
+    metadata = dict(metadata_items)
+    
+    discovery_payload = {
+        "name": metadata.get("name", param_name),
+        "unique_id": f"{device_id}_{param_name}",
+        "state_topic": f"{topic_prefix}/{device_id}/{param_name}",
+        "availability_topic": f"{topic_prefix}/{device_id}/status",
+        "payload_available": "online",
+        "payload_not_available": "offline",
+    }
+    
+    # Add unit if present
+    if metadata.get("unit"):
+        discovery_payload["unit_of_measurement"] = metadata["unit"]
+    
+    # Add icon if present
+    if metadata.get("icon"):
+        discovery_payload["icon"] = metadata["icon"]
+    
+    # Add device_class if present (enables special formatting and features)
+    if metadata.get("device_class"):
+        discovery_payload["device_class"] = metadata["device_class"]
+    
+    # Add state_class if present (defines value semantics)
+    if metadata.get("state_class"):
+        discovery_payload["state_class"] = metadata["state_class"]
+    
+    # For numeric values, add value template
+    discovery_payload["value_template"] = "{{ value }}"
+    
+    # Append the pre-encoded device object as the last member
+    return _dumps(discovery_payload)[:-1] + b',"device":' + device_json + b"}"
+
+
 class mqtt_handler:
     """MQTT handler for publishing meter metrics."""
     
+    __slots__ = (
+        "broker", "port", "client_id", "keepalive", "username", "password", "tls_params",
+        "tls_insecure", "mqtt_client", "is_connected", "qos", "retain", "topic_prefix",
+        "ha_discovery_prefix", "published_entities", "_topic_cache", "_lock",
+        "_outstanding", "_early_acks", "_drained",
+    )
+    
     def __init__(self, paho_config):
         """
         Initialize MQTT handler.
@@ -20,54 +93,64 @@ class mqtt_handler:
         Args:
             paho_config: Dictionary from config.get_mqtt_config()
         """
-        self.paho_config = paho_config.copy()
+        self.broker = paho_config.get("broker", "localhost")
+        self.port = paho_config.get("port", 1883)
+        self.client_id = paho_config.get("client_id", "meter2mqtt")
+        self.keepalive = paho_config.get("keepalive", 60)
+        self.username = paho_config.get("username")
+        self.password = paho_config.get("password")
+        self.tls_params = paho_config.get("tls_params")
+        self.tls_insecure = paho_config.get("tls_insecure", False)
         self.mqtt_client = None
         self.is_connected = False
-        self.qos = self.paho_config.pop("qos", 1)
-        self.retain = self.paho_config.pop("retain", True)
-        self.topic_prefix = self.paho_config.pop("topic_prefix", "meters")
-        self.ha_discovery_prefix = self.paho_config.pop("ha_discovery_prefix", "homeassistant")
+        self.qos = paho_config.get("qos", 1)
+        self.retain = paho_config.get("retain", True)
+        self.topic_prefix = paho_config.get("topic_prefix", "meters")
+        self.ha_discovery_prefix = paho_config.get("ha_discovery_prefix", "homeassistant")
         self.published_entities = {}  # Track which entities have been discovered
+        # State topics by device_id, then parameter; each device's dict is
+        # replaced as a whole when it is (re)discovered
+        self._topic_cache: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()  # Keeps a batch of publishes contiguous
+        # Message ids of QoS > 0 publishes the broker has not acknowledged yet,
+        # maintained by the on_publish callback so callers never wait per message.
+        # Acks that arrive before the publishing thread registered the mid are
+        # parked in _early_acks.
+        self._outstanding: Set[int] = set()
+        self._early_acks: Set[int] = set()
+        self._drained = threading.Condition()
     
     def connect(self):
         """Connect to MQTT broker."""
         try:
             # Create client with client_id
-            client_id = self.paho_config.pop("client_id")
-            self.mqtt_client = paho.Client(paho.CallbackAPIVersion.VERSION1, client_id, True)
+            self.mqtt_client = paho.Client(paho.CallbackAPIVersion.VERSION1, self.client_id, True)
             
             # Register callbacks
             self.mqtt_client.on_connect = self._on_connect
             self.mqtt_client.on_disconnect = self._on_disconnect
+            self.mqtt_client.on_publish = self._on_publish
             
             # Set Last Will Testament
             will_topic = f"{self.topic_prefix}/status"
             self.mqtt_client.will_set(will_topic, payload="offline", qos=1, retain=True)
             
             # Set authentication if provided
-            if "username" in self.paho_config and "password" in self.paho_config:
-                username = self.paho_config.pop("username")
-                password = self.paho_config.pop("password")
-                self.mqtt_client.username_pw_set(username, password)
-                log.info(f"MQTT authentication enabled for user: {username}")
+            if self.username is not None:
+                self.mqtt_client.username_pw_set(self.username, self.password)
+                log.info(f"MQTT authentication enabled for user: {self.username}")
             
             # Set TLS if provided
-            if "tls_params" in self.paho_config:
-                tls_params = self.paho_config.pop("tls_params")
-                tls_insecure = self.paho_config.pop("tls_insecure", False)
-                self.mqtt_client.tls_set(**tls_params)
-                self.mqtt_client.tls_insecure_set(tls_insecure)
+            if self.tls_params is not None:
+                self.mqtt_client.tls_set(**self.tls_params)
+                self.mqtt_client.tls_insecure_set(self.tls_insecure)
                 log.info("MQTT TLS enabled")
             
             # Connect
-            broker = self.paho_config.pop("broker")
-            port = self.paho_config.pop("port")
-            keepalive = self.paho_config.pop("keepalive", 60)
-            
-            self.mqtt_client.connect(broker, port, keepalive)
+            self.mqtt_client.connect(self.broker, self.port, self.keepalive)
             self.mqtt_client.loop_start()
             
-            log.info(f"Connecting to MQTT at: {broker}:{port}")
+            log.info(f"Connecting to MQTT at: {self.broker}:{self.port}")
             
         except Exception as e:
             log.error(f"Failed to connect to MQTT: {e}")
@@ -77,8 +160,17 @@ class mqtt_handler:
         if rc == 0:
             self.is_connected = True
             log.info("MQTT client connected successfully")
+            
+            # Small metric messages should go out immediately, not wait on Nagle
+            try:
+                sock = client.socket()
+                if sock is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError as e:
+                log.debug(f"Could not set TCP_NODELAY on MQTT socket: {e}")
+            
             try:
-                client.publish(f"{self.topic_prefix}/status", "online", qos=1, retain=True)
+                self._track(client.publish(f"{self.topic_prefix}/status", "online", qos=1, retain=True))
             except Exception as e:
                 log.error(f"Failed to publish online status: {e}")
         else:
@@ -91,6 +183,56 @@ class mqtt_handler:
         if rc != 0:
             log.warning(f"Unexpected disconnection from MQTT (code {rc})")
     
+    def _on_publish(self, client, userdata, mid):
+        """Callback for when a publish completed (sent for QoS 0, acknowledged otherwise)."""
+        if self.qos == 0:
+            return
+        
+        with self._drained:
+            try:
+                self._outstanding.remove(mid)
+            except KeyError:
+                self._early_acks.add(mid)
+            else:
+                if not self._outstanding:
+                    self._drained.notify_all()
+    
+    def _track(self, mqtt_info: paho.MQTTMessageInfo):
+        """
+        Register a queued publish as outstanding until the broker acknowledges it.
+        
+        Args:
+            mqtt_info: Handle returned by paho's publish()
+        """
+        # QoS 0 has no acknowledgement, and paho drops messages it could not queue
+        if self.qos == 0 or mqtt_info.rc == paho.MQTT_ERR_QUEUE_SIZE:
+            return
+        
+        with self._drained:
+            if mqtt_info.mid in self._early_acks:
+                self._early_acks.remove(mqtt_info.mid)
+            else:
+                self._outstanding.add(mqtt_info.mid)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued publishes have been acknowledged by the broker.
+        
+        Publishing never blocks on delivery; the network loop thread processes
+        the acknowledgements. Call this at shutdown or between polling cycles.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            bool: True if nothing is outstanding, False on timeout
+        """
+        with self._drained:
+            drained = self._drained.wait_for(lambda: not self._outstanding, timeout)
+        if not drained:
+            log.warning(f"{len(self._outstanding)} MQTT publishes still unacknowledged")
+        return drained
+    
     def disconnect(self):
         """Disconnect from MQTT broker."""
         try:
@@ -99,26 +241,100 @@ class mqtt_handler:
         except Exception as e:
             log.error(f"Failed to disconnect from MQTT: {e}")
 
-    def publish(self, topic: str, message: str):
+    def publish(self, topic: str, message: Union[str, bytes]):
+        """
+        Publish message to MQTT topic and wait for delivery.
+        
+        Args:
+            topic: Full topic path
+            message: Message to publish (str, or already encoded bytes)
+        """
+        mqtt_info = self.publish_nowait(topic, message)
+        if mqtt_info is not None:
+            self.wait_for_publishes([(topic, mqtt_info)])
+
+    def publish_nowait(self, topic: str, message: Union[str, bytes]) -> Optional[paho.MQTTMessageInfo]:
         """
-        Publish message to MQTT topic.
+        Queue a message for publishing without waiting for delivery.
         
         Args:
             topic: Full topic path
-            message: Message to publish
+            message: Message to publish (str, or already encoded bytes)
+        
+        Returns:
+            MQTTMessageInfo: Handle for wait_for_publishes(), or None if not queued
         """
         if not self.mqtt_client or not self.mqtt_client.is_connected():
-            broker = self.paho_config.get("broker", "unknown")
-            port = self.paho_config.get("port", "unknown")
-            log.warning(f"Cannot publish to MQTT: not connected to {broker}:{port}")
-            return
+            log.warning(f"Cannot publish to MQTT: not connected to {self.broker}:{self.port}")
+            return None
         
         try:
             log.debug(f"Publishing '{topic}': {message}")
-            mqtt_info = self.mqtt_client.publish(topic, message, self.qos, self.retain)
-            mqtt_info.wait_for_publish()
+            with self._lock:
+                mqtt_info = self.mqtt_client.publish(topic, message, self.qos, self.retain)
+            self._track(mqtt_info)
+            return mqtt_info
         except Exception as e:
             log.error(f"Failed to publish to {topic}: {e}")
+            return None
+
+    def publish_many(self, messages: List[Tuple[str, Union[str, bytes]]], wait: bool = True) -> List[Tuple[str, paho.MQTTMessageInfo]]:
+        """
+        Publish a batch of messages.
+        
+        All messages are queued under a single lock acquisition before waiting
+        on any of them, so the network loop can write them back to back.
+        
+        Args:
+            messages: List of (topic, message) tuples
+            wait: Wait for delivery before returning. With False, the caller
+                  passes the returned handles to wait_for_publishes() later,
+                  or relies on flush().
+        
+        Returns:
+            list: (topic, MQTTMessageInfo) for each queued message
+        """
+        if not messages:
+            return []
+        
+        if not self.mqtt_client or not self.mqtt_client.is_connected():
+            log.warning(f"Cannot publish to MQTT: not connected to {self.broker}:{self.port}")
+            return []
+        
+        pending = []
+        with self._lock:
+            for topic, message in messages:
+                try:
+                    log.debug(f"Publishing '{topic}': {message}")
+                    pending.append((topic, self.mqtt_client.publish(topic, message, self.qos, self.retain)))
+                except Exception as e:
+                    log.error(f"Failed to publish to {topic}: {e}")
+        
+        for _, mqtt_info in pending:
+            self._track(mqtt_info)
+        
+        if wait:
+            self.wait_for_publishes(pending)
+        return pending
+
+    def wait_for_publishes(self, pending: List[Tuple[str, paho.MQTTMessageInfo]]):
+        """
+        Wait for previously queued publishes to complete.
+        
+        QoS 0 messages have no broker acknowledgement to wait for; they are
+        handed to the network loop and not waited on.
+        
+        Args:
+            pending: (topic, MQTTMessageInfo) handles from publish_many(wait=False)
+        """
+        if self.qos == 0:
+            return
+        
+        for topic, mqtt_info in pending:
+            try:
+                mqtt_info.wait_for_publish()
+            except Exception as e:
+                log.error(f"Failed to publish to {topic}: {e}")
 
     def loop_stop(self):
         """Stop MQTT client loop."""
@@ -162,15 +378,36 @@ class mqtt_handler:
                 "manufacturer": device_info.get("manufacturer", "Unknown"),
                 "model": device_info.get("model", "Unknown"),
             }
+            ha_device_json = _dumps(ha_device)
             
-            # Publish discovery for each parameter
-            published_count = 0
+            topic_base = f"{self.topic_prefix}/{device_id}/"
+            topics = {param_name: topic_base + param_name for param_name in device_metadata}
+            topics["status"] = topic_base + "status"
+            self._topic_cache[device_id] = topics
+            
+            # Queue discovery for each parameter, then wait for all of them at once
+            pending = []
             for param_name, metadata in device_metadata.items():
-                if self._publish_entity_discovery(device_id, param_name, metadata, ha_device):
-                    published_count += 1
+                # One bad parameter must not cost the device its other entities
+                try:
+                    queued = self._publish_entity_discovery(device_id, param_name, metadata, ha_device_json)
+                except Exception as e:
+                    log.error(f"Failed to publish entity discovery for {device_id}/{param_name}: {e}")
+                    continue
+                if queued is not None:
+                    pending.append(queued)
+            published_count = len(pending)
             
             # Publish availability/status sensor
-            self._publish_status_discovery(device_id, ha_device)
+            try:
+                queued = self._publish_status_discovery(device_id, ha_device)
+            except Exception as e:
+                log.error(f"Failed to publish status discovery for {device_id}: {e}")
+                queued = None
+            if queued is not None:
+                pending.append(queued)
+            
+            self.wait_for_publishes(pending)
             
             log.info(f"Published discovery for {published_count} entities for device {device_id}")
             self.published_entities[device_id] = list(device_metadata.keys())
@@ -178,92 +415,66 @@ class mqtt_handler:
         except Exception as e:
             log.error(f"Failed to publish discovery for {device_id}: {e}")
     
-    def _publish_entity_discovery(self, device_id: str, param_name: str, 
-                                   metadata: Dict[str, Any], ha_device: Dict[str, Any]) -> bool:
+    def _publish_entity_discovery(self, device_id: str, param_name: str, metadata: Dict[str, Any],
+                                  ha_device_json: bytes) -> Optional[Tuple[str, paho.MQTTMessageInfo]]:
         """
-        Publish a single Home Assistant entity discovery message.
+        Queue a single Home Assistant entity discovery message.
+        
+        Errors building the payload propagate; the caller logs them per entity.
         
         Args:
             device_id: Device identifier
             param_name: Parameter name
             metadata: Parameter metadata
-            ha_device: Home Assistant device info
+            ha_device_json: Encoded Home Assistant device info
         
         Returns:
-            bool: True if published successfully
+            tuple: (topic, MQTTMessageInfo) if queued, else None
         """
+        # Payload construction is pure; publish_nowait() handles network errors
+        unique_id = f"{device_id}_{param_name}"
+        payload_args = (self.topic_prefix, device_id, param_name, tuple(metadata.items()), ha_device_json)
         try:
-            # Create unique ID and entity ID
-            unique_id = f"{device_id}_{param_name}"
-            
-            # Build discovery payload
-            discovery_payload = {
-                "name": metadata.get("name", param_name),
-                "unique_id": unique_id,
-                "state_topic": f"{self.topic_prefix}/{device_id}/{param_name}",
-                "availability_topic": f"{self.topic_prefix}/{device_id}/status",
-                "payload_available": "online",
-                "payload_not_available": "offline",
-                "device": ha_device,
-            }
-            
-            # Add unit if present
-            if metadata.get("unit"):
-                discovery_payload["unit_of_measurement"] = metadata["unit"]
-            
-            # Add icon if present
-            if metadata.get("icon"):
-                discovery_payload["icon"] = metadata["icon"]
-            
-            # Add device_class if present (enables special formatting and features)
-            if metadata.get("device_class"):
-                discovery_payload["device_class"] = metadata["device_class"]
-            
-            # Add state_class if present (defines value semantics)
-            if metadata.get("state_class"):
-                discovery_payload["state_class"] = metadata["state_class"]
-            
-            # For numeric values, add value template
-            discovery_payload["value_template"] = "{{ value }}"
-            
-            # Publish discovery message to Home Assistant
-            discovery_topic = f"{self.ha_discovery_prefix}/sensor/{unique_id}/config"
-            payload_json = json.dumps(discovery_payload)
-            
-            log.debug(f"Publishing discovery to {discovery_topic}")
-            self.publish(discovery_topic, payload_json)
-            return True
+            payload_json = _entity_discovery_payload(*payload_args)
+        except TypeError:
+            # Unhashable metadata values (e.g. lists) cannot key the cache
+            payload_json = _entity_discovery_payload.__wrapped__(*payload_args)
         
-        except Exception as e:
-            log.error(f"Failed to publish entity discovery for {device_id}/{param_name}: {e}")
-            return False
+        # Publish discovery message to Home Assistant
+        discovery_topic = f"{self.ha_discovery_prefix}/sensor/{unique_id}/config"
+        
+        log.debug(f"Publishing discovery to {discovery_topic}")
+        mqtt_info = self.publish_nowait(discovery_topic, payload_json)
+        return None if mqtt_info is None else (discovery_topic, mqtt_info)
     
-    def _publish_status_discovery(self, device_id: str, ha_device: Dict[str, Any]):
+    def _publish_status_discovery(self, device_id: str,
+                                  ha_device: Dict[str, Any]) -> Optional[Tuple[str, paho.MQTTMessageInfo]]:
         """
-        Publish availability/status entity discovery.
+        Queue availability/status entity discovery.
         
         Args:
             device_id: Device identifier
             ha_device: Home Assistant device info
+        
+        Returns:
+            tuple: (topic, MQTTMessageInfo) if queued, else None
         """
-        try:
-            unique_id = f"{device_id}_status"
-            status_payload = {
-                "name": f"{device_id} Status",
-                "unique_id": unique_id,
-                "state_topic": f"{self.topic_prefix}/{device_id}/status",
-                "payload_on": "online",
-                "payload_off": "offline",
-                "device": ha_device,
-                "icon": "mdi:connection",
-            }
-            
-            discovery_topic = f"{self.ha_discovery_prefix}/binary_sensor/{unique_id}/config"
-            payload_json = json.dumps(status_payload)
-            
-            self.publish(discovery_topic, payload_json)
-        except Exception as e:
-            log.error(f"Failed to publish status discovery for {device_id}: {e}")
+        unique_id = f"{device_id}_status"
+        status_payload = {
+            "name": f"{device_id} Status",
+            "unique_id": unique_id,
+            "state_topic": f"{self.topic_prefix}/{device_id}/status",
+            "payload_on": "online",
+            "payload_off": "offline",
+            "device": ha_device,
+            "icon": "mdi:connection",
+        }
+        
+        discovery_topic = f"{self.ha_discovery_prefix}/binary_sensor/{unique_id}/config"
+        payload_json = _dumps(status_payload)
+        
+        mqtt_info = self.publish_nowait(discovery_topic, payload_json)
+        return None if mqtt_info is None else (discovery_topic, mqtt_info)
     
     def publish_device_value(self, device_id: str, parameter: str, value: Any):
         """
@@ -274,7 +485,7 @@ class mqtt_handler:
             parameter: Parameter name
             value: Parameter value
         """
-        topic = f"{self.topic_prefix}/{device_id}/{parameter}"
+        topic = self._topic_cache.get(device_id, {}).get(parameter) or f"{self.topic_prefix}/{device_id}/{parameter}"
         self.publish(topic, str(value))
     
     def publish_device_status(self, device_id: str, status: str):
@@ -285,5 +496,5 @@ class mqtt_handler:
             device_id: Device identifier
             status: Status string ("online" or "offline")
         """
-        topic = f"{self.topic_prefix}/{device_id}/status"
+        topic = self._topic_cache.get(device_id, {}).get("status") or f"{self.topic_prefix}/{device_id}/status"
         self.publish(topic, status)